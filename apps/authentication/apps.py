@@ -8,4 +8,4 @@ class AuthenticationConfig(AppConfig):
     def ready(self):
         # import apps.authentication.signals  # noqa
 
-        pass
+        import apps.authentication.roles  # noqa
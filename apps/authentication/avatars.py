@@ -0,0 +1,11 @@
+from apps.main.images import schedule_image
+
+# Avatars are shown at navbar size, so larger uploads are shrunk to this box
+AVATAR_SIZE = 100
+AVATAR_FOLDER = "profile_images"
+
+
+# =================================== Avatar processing ===================================
+def schedule_avatar(profile, upload_file):
+    """Shrink and store ``upload_file`` off the request thread once ``profile`` commits."""
+    schedule_image(profile, "avatar", upload_file, AVATAR_FOLDER, AVATAR_SIZE)
@@ -1,65 +1,69 @@
-from apps.authentication.models import Profile, Contact
-from apps.products.models import Product
-from apps.orders.models import Order
-from django.db.models import F
-
-
-def guest_profiles_context(request):
-    # Fetch all profiles with the role "guest"
-    guest_profiles = Profile.objects.filter(role="guest")
-
-    # Calculate the number of guest profiles
-    guest_count = guest_profiles.count()
-
-    # Return context dictionary
+from apps.authentication.models import Profile
+from apps.main.metrics import ACCOUNTS, cached_metric
+from django.utils.functional import SimpleLazyObject
+
+from .decorators import STAFF_ROLES
+from .roles import get_user_role
+
+# Navbar badges are shared by every staff member, so a short cache is enough
+BADGE_CACHE_TIMEOUT = 60
+# Entries listed under each badge
+BADGE_ITEMS = 10
+
+EMPTY_BADGE = {"items": [], "count": 0}
+
+
+# =================================== Badge helpers ===================================
+def is_staff_member(user):
+    """True for signed in users with a back office role."""
+    return get_user_role(user) in STAFF_ROLES
+
+
+def _badge_context(request, name, queryset, groups, items_key, count_key):
+    """
+    Context for one navbar badge. Nothing runs until a template reads one of
+    the values: non-staff users then get an empty badge, staff the shared
+    cached count and first ``BADGE_ITEMS`` entries of ``queryset``.
+    """
+
+    def load():
+        if not is_staff_member(request.user):
+            return EMPTY_BADGE
+        return cached_metric(
+            f"badge:{name}",
+            lambda: {
+                "items": list(queryset[:BADGE_ITEMS]),
+                "count": queryset.count(),
+            },
+            groups,
+            BADGE_CACHE_TIMEOUT,
+        )
+
+    badge = SimpleLazyObject(load)
     return {
-        "guest_profiles": guest_profiles,
-        "guest_count": guest_count,
+        items_key: SimpleLazyObject(lambda: badge["items"]),
+        count_key: SimpleLazyObject(lambda: badge["count"]),
     }
 
 
-def guest_user_feedback_context(request):
-    # Fetch all invalid feedback entries
-    user_feedback = Contact.objects.filter(is_valid=False)
+# =================================== Context processors ===================================
+def user_role_context(request):
+    # Templates check roles through this instead of loading user.profile
+    return {"user_role": SimpleLazyObject(lambda: get_user_role(request.user))}
 
-    # Calculate the count of invalid feedback entries
-    feedback_count = user_feedback.count()
 
-    # Return context dictionary
-    return {
-        "user_feedback": user_feedback,
-        "feedback_count": feedback_count,
-    }
-
-
-def low_stock_alerts_context(request):
-    # Fetch all products along with their inventory
-    products = Product.objects.select_related("inventory").all()
-
-    # Filter products with low stock based on inventory
-    low_stock_products = products.filter(
-        inventory__quantity__lte=F("inventory__low_stock_threshold")
+def guest_profiles_context(request):
+    # Profiles with the role "guest", newest first
+    guest_profiles = (
+        Profile.objects.filter(role="guest")
+        .select_related("user")
+        .order_by("-user__date_joined")
+    )
+    return _badge_context(
+        request,
+        "guest-profiles",
+        guest_profiles,
+        [ACCOUNTS],
+        "guest_profiles",
+        "guest_count",
     )
-
-    # Count of low stock products
-    low_stock_count = low_stock_products.count()
-
-    return {
-        "low_stock_products": low_stock_products,
-        "low_stock_count": low_stock_count,
-    }
-
-
-def pending_orders_context(request):
-    # Fetch orders with statuses "Pending" or "Shipped"
-    pending_and_shipped_orders = Order.objects.filter(
-        status__in=["Pending", "Shipped"]
-    ).select_related("customer")
-
-    # Count the total number of pending and shipped orders
-    pending_and_shipped_count = pending_and_shipped_orders.count()
-
-    return {
-        "pending_and_shipped_orders": pending_and_shipped_orders,
-        "pending_orders_count": pending_and_shipped_count,
-    }
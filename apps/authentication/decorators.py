@@ -2,6 +2,11 @@ from functools import wraps
 
 from django.shortcuts import render
 
+from .roles import get_user_role
+
+# Roles allowed into the back office
+STAFF_ROLES = ("administrator", "manager", "staff")
+
 
 def role_required(roles):
     """Decorator to require one or more roles."""
@@ -11,8 +16,7 @@ def role_required(roles):
     def decorator(view_func):
         @wraps(view_func)
         def _wrapped_view(request, *args, **kwargs):
-            user_profile = getattr(request.user, "profile", None)
-            if not user_profile or user_profile.role not in roles:
+            if get_user_role(request.user) not in roles:
                 return render(request, "accounts/errors/403.html", status=403)
             return view_func(request, *args, **kwargs)
 
@@ -33,4 +37,4 @@ def admin_or_manager_required(view_func):
 
 def admin_or_manager_or_staff_required(view_func):
     """Decorator to require the user to be either an administrator, manager, or staff."""
-    return role_required(["administrator", "manager", "staff"])(view_func)
+    return role_required(STAFF_ROLES)(view_func)
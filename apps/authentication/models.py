@@ -1,12 +1,10 @@
 from django.contrib.auth.models import User
-import requests
-from io import BytesIO
-from cloudinary.uploader import upload
 from cloudinary.models import CloudinaryField
-from django.core.files.uploadedfile import InMemoryUploadedFile
 
 from django.db import models
-from PIL import Image
+
+from apps.main.images import take_upload
+from .avatars import schedule_avatar
 
 
 # =================================== Profile Model  ===================================
@@ -29,39 +27,11 @@ class Profile(models.Model):
         return self.user.username
 
     def save(self, *args, **kwargs):
-        if isinstance(self.avatar, CloudinaryField):
-            # If the avatar is already a Cloudinary resource
-            response = requests.get(self.avatar.url)
-            if response.status_code == 200:
-                img = Image.open(BytesIO(response.content))
-
-                # Resize if necessary
-                if img.height > 100 or img.width > 100:
-                    output = BytesIO()
-                    img.thumbnail((100, 100))
-                    img.save(output, format=img.format)
-                    output.seek(0)
-
-                    # Re-upload resized image to Cloudinary
-                    upload_result = upload(output, folder="profile_images")
-                    self.avatar = upload_result["public_id"]
-
-        elif isinstance(self.avatar, InMemoryUploadedFile):
-            # If a new file is being uploaded
-            img = Image.open(self.avatar)
-
-            # Resize if necessary
-            if img.height > 100 or img.width > 100:
-                output = BytesIO()
-                img.thumbnail((100, 100))
-                img.save(output, format=img.format)
-                output.seek(0)
-
-                # Upload resized image to Cloudinary
-                upload_result = upload(output, folder="profile_images")
-                self.avatar = upload_result["public_id"]
-
+        # Only a new upload needs image work; that runs once the save commits
+        new_avatar = take_upload(self, "avatar")
         super().save(*args, **kwargs)
+        if new_avatar:
+            schedule_avatar(self, new_avatar)
 
 
 # =================================== Contact Model  ===================================
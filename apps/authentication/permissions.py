@@ -0,0 +1,17 @@
+from rest_framework.permissions import BasePermission
+
+from .decorators import STAFF_ROLES
+from .roles import get_user_role
+
+
+class RolePermission(BasePermission):
+    """DRF counterpart of ``role_required`` for API views."""
+
+    roles = ()
+
+    def has_permission(self, request, view):
+        return get_user_role(request.user) in self.roles
+
+
+class IsAdminOrManagerOrStaff(RolePermission):
+    roles = STAFF_ROLES
@@ -0,0 +1,63 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Profile
+
+# Roles only change through Profile saves, which clear the entry
+ROLE_CACHE_TIMEOUT = 60 * 60 * 24
+# Cached for users without a profile, since the cache cannot hold None
+NO_ROLE = ""
+_UNRESOLVED = object()
+
+
+# =================================== Role resolution ===================================
+def _role_key(user_id):
+    return f"user-role:{user_id}"
+
+
+def get_role_for_user_id(user_id):
+    """Role of the user with ``user_id``, from the shared cache when possible."""
+    key = _role_key(user_id)
+    role = cache.get(key)
+    if role is None:
+        role = (
+            Profile.objects.filter(user_id=user_id)
+            .values_list("role", flat=True)
+            .first()
+        ) or NO_ROLE
+        cache.set(key, role, ROLE_CACHE_TIMEOUT)
+    return role or None
+
+
+def get_user_role(user):
+    """
+    Role of ``user``, or None for anonymous users and users without a
+    profile. Resolved once per request and shared across requests through
+    the cache. With Redis or an in-memory cache a cached role costs no
+    query; with the DatabaseCache fallback the cache read is itself one
+    primary-key query, which replaces the profile lookup rather than
+    removing it.
+    """
+    if not user.is_authenticated:
+        return None
+    role = getattr(user, "_cached_role", _UNRESOLVED)
+    if role is _UNRESOLVED:
+        profile = user._state.fields_cache.get("profile")
+        role = profile.role if profile else get_role_for_user_id(user.pk)
+        user._cached_role = role
+    return role
+
+
+def invalidate_user_role(user_id):
+    # Cleared now and again on commit, so a request racing the write cannot
+    # cache the old role for the rest of the day
+    cache.delete(_role_key(user_id))
+    transaction.on_commit(lambda: cache.delete(_role_key(user_id)))
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_role(sender, instance, **kwargs):
+    invalidate_user_role(instance.user_id)
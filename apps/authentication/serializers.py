@@ -0,0 +1,30 @@
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .roles import get_role_for_user_id, get_user_role
+
+
+# =================================== JWT ===================================
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Adds the user's role as the ``role`` claim of issued tokens."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["role"] = get_user_role(user)
+        return token
+
+
+class RoleTokenRefreshSerializer(TokenRefreshSerializer):
+    """Re-reads the role on refresh, so a role change reaches new access tokens."""
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        access = AccessToken(data["access"])
+        access["role"] = get_role_for_user_id(access[api_settings.USER_ID_CLAIM])
+        data["access"] = str(access)
+        return data
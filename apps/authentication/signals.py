@@ -11,11 +11,6 @@ def create_profile(sender, instance, created, **kwargs):
         Profile.objects.create(user=instance)
 
 
-@receiver(post_save, sender=User)
-def save_profile(sender, instance, **kwargs):
-    instance.profile.save()
-
-
 # @receiver(post_save, sender=User)
 # def create_customer(sender, instance, created, **kwargs):
 #     if created:
@@ -1 +1,183 @@
-# Create your tests here.
+import os
+from io import BytesIO
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework_simplejwt.tokens import AccessToken
+
+from apps.main.testing import LocalImagesMixin
+
+from .context_processors import guest_profiles_context
+from .models import Profile
+from .roles import get_user_role
+
+
+# =================================== Navbar badges ===================================
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class BadgeContextTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff", password="staff-password")
+        Profile.objects.create(user=cls.staff, role="staff", bio="")
+        cls.guest = User.objects.create_user("guest", password="guest-password")
+        Profile.objects.create(user=cls.guest, role="guest", bio="")
+
+    def request_for(self, user):
+        request = RequestFactory().get("/")
+        request.user = user
+        return request
+
+    def test_values_are_lazy(self):
+        with self.assertNumQueries(0):
+            guest_profiles_context(self.request_for(self.staff))
+
+    def test_non_staff_get_empty_badges(self):
+        for user in (
+            AnonymousUser(),
+            User.objects.select_related("profile").get(pk=self.guest.pk),
+        ):
+            context = guest_profiles_context(self.request_for(user))
+            with self.assertNumQueries(0):
+                self.assertEqual(str(context["guest_count"]), "0")
+                self.assertFalse(context["guest_profiles"])
+
+    def test_counts_are_cached_until_profiles_change(self):
+        staff = User.objects.select_related("profile").get(pk=self.staff.pk)
+        context = guest_profiles_context(self.request_for(staff))
+        self.assertEqual(str(context["guest_count"]), "1")
+        self.assertEqual(
+            [p.user.username for p in context["guest_profiles"]], ["guest"]
+        )
+
+        with self.assertNumQueries(0):
+            context = guest_profiles_context(self.request_for(staff))
+            self.assertEqual(str(context["guest_count"]), "1")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            newcomer = User.objects.create_user("newcomer", password="new-password")
+            Profile.objects.create(user=newcomer, role="guest", bio="")
+        context = guest_profiles_context(self.request_for(staff))
+        self.assertEqual(str(context["guest_count"]), "2")
+        self.assertEqual(
+            [p.user.username for p in context["guest_profiles"]],
+            ["newcomer", "guest"],
+        )
+
+
+# =================================== Avatars ===================================
+def background_tasks(callbacks):
+    return [
+        callback
+        for callback in callbacks
+        if callback.__qualname__.startswith("run_in_background.")
+    ]
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ProfileAvatarTests(LocalImagesMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        user = User.objects.create_user("member", password="member-password")
+        cls.profile = Profile.objects.create(user=user, bio="")
+
+    def test_save_without_new_avatar_does_no_image_work(self):
+        profile = Profile.objects.get(pk=self.profile.pk)
+        profile.bio = "Updated"
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertNumQueries(1):
+                profile.save()
+        self.assertEqual(background_tasks(callbacks), [])
+
+    def test_upload_is_processed_in_the_background(self):
+        image = BytesIO()
+        Image.new("RGB", (300, 200)).save(image, format="PNG")
+        profile = Profile.objects.get(pk=self.profile.pk)
+        stored = str(profile.avatar)
+        profile.avatar = SimpleUploadedFile(
+            "avatar.png", image.getvalue(), content_type="image/png"
+        )
+        with self.captureOnCommitCallbacks() as callbacks:
+            profile.save()
+        self.assertEqual(len(background_tasks(callbacks)), 1)
+        # The current avatar is kept until the upload has been processed
+        self.assertEqual(str(Profile.objects.get(pk=profile.pk).avatar), stored)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(
+            Profile.objects.get(pk=profile.pk).avatar.url,
+            "http://testserver/media/images/profile_images/avatar",
+        )
+        with Image.open(
+            os.path.join(self.image_dir, "profile_images", "avatar")
+        ) as avatar:
+            self.assertEqual(avatar.size, (100, 67))
+
+
+# =================================== Roles ===================================
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class RoleResolutionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("manager", password="manager-password")
+        cls.profile = Profile.objects.create(user=cls.user, role="manager", bio="")
+
+    def setUp(self):
+        # Role changes are rolled back between tests, but not the cache
+        cache.clear()
+
+    def test_role_is_cached_across_requests(self):
+        self.assertEqual(get_user_role(User.objects.get(pk=self.user.pk)), "manager")
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_role(user), "manager")
+        self.assertIsNone(get_user_role(AnonymousUser()))
+
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "django_cache",
+            }
+        }
+    )
+    def test_database_cache_read_replaces_the_profile_query(self):
+        cache.clear()
+        get_user_role(User.objects.get(pk=self.user.pk))
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1) as captured:
+            self.assertEqual(get_user_role(user), "manager")
+        self.assertIn("django_cache", captured.captured_queries[0]["sql"])
+
+    def test_role_change_clears_the_cache(self):
+        get_user_role(User.objects.get(pk=self.user.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.role = "guest"
+            self.profile.save()
+        self.assertEqual(get_user_role(User.objects.get(pk=self.user.pk)), "guest")
+
+    def test_jwt_carries_the_role(self):
+        response = self.client.post(
+            reverse("jwt-create"),
+            {"username": "manager", "password": "manager-password"},
+        )
+        self.assertEqual(AccessToken(response.json()["access"])["role"], "manager")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.role = "staff"
+            self.profile.save()
+        response = self.client.post(
+            reverse("jwt-refresh"), {"refresh": response.json()["refresh"]}
+        )
+        self.assertEqual(AccessToken(response.json()["access"])["role"], "staff")
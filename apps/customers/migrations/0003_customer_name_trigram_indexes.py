@@ -0,0 +1,34 @@
+from django.db import migrations
+
+# Trigram indexes on the upper-cased names serve the UPPER(...) LIKE queries
+# Django emits for icontains/istartswith lookups on PostgreSQL
+NAME_COLUMNS = ("first_name", "last_name")
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in NAME_COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "customers_{column}_trgm" '
+            f'ON "Customers" USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for column in NAME_COLUMNS:
+        schema_editor.execute(f'DROP INDEX IF EXISTS "customers_{column}_trgm"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("customers", "0002_alter_customer_address_alter_customer_email"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -4,7 +4,7 @@ from decimal import Decimal
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum, F, Count, OuterRef, Subquery
+from django.db.models import Sum, Count, OuterRef, Subquery
 from django.db import transaction
 from datetime import date
 from openpyxl import load_workbook
@@ -15,7 +15,7 @@ from .forms import (
     TransactionFormSet,
     ImportCOAForm,
 )
-from apps.sales.models import SaleDetail, Sale
+from apps.sales.models import DailySalesSummary, Sale
 from apps.products.models import ProductVolume
 from .models import ChartOfAccounts, Transaction
 from apps.sales.forms import ReportPeriodForm
@@ -462,9 +462,9 @@ def profit_and_loss_view(request):
         end_date = form.cleaned_data["end_date"]
 
         # Filter data based on the date range
-        # Step 1: Query the related SaleDetails for the desired Sale objects
-        sales_details = SaleDetail.objects.filter(
-            sale__trans_date__range=(start_date, end_date)
+        # Step 1: Query the daily sales rollups for the period
+        sales_rollups = DailySalesSummary.objects.filter(
+            date__range=(start_date, end_date)
         )
 
         expense_transactions = Transaction.objects.filter(
@@ -476,14 +476,16 @@ def profit_and_loss_view(request):
             account__account_type="revenue",
         ).exclude(account__account_name="Sales Revenue")
 
-        # Step 2: Aggregate total revenue (Sum of quantity * price)
-        total_revenue = sales_details.aggregate(
-            total_revenue=Sum(F("quantity") * F("price"))
+        # Step 2: Aggregate total revenue (sale line totals) and COGS
+        # (unit cost captured when the sale was posted) from the rollups
+        total_revenue = sales_rollups.aggregate(
+            total_revenue=Sum("revenue"),
+            total_cogs=Sum("cogs_total"),
         )
 
         # Step 3: Extract the total revenue value from the dictionary
         # Ensure it is a Decimal (if None, set to Decimal("0.00"))
-        revenue_value = Decimal(total_revenue["total_revenue"] or "0.00")
+        revenue_value = Decimal(str(round(total_revenue["total_revenue"] or 0, 2)))
 
         # Step 4: Calculate Other Income (Sum of amounts for income transactions)
         other_income = other_income_transactions.aggregate(total_income=Sum("amount"))[
@@ -515,11 +517,7 @@ def profit_and_loss_view(request):
         total_expenses = sum(operating_expenses.values())
 
         # Calculate COGS (Cost of Goods Sold)
-        cogs = (
-            SaleDetail.objects.filter(sale__trans_date__range=[start_date, end_date])
-            .annotate(cogs=F("product_volume__cost") * F("quantity"))
-            .aggregate(total_cogs=Sum("cogs"))
-        )["total_cogs"] or 0
+        cogs = Decimal(str(round(total_revenue["total_cogs"] or 0, 2)))
 
         # Calculate Gross Profit (Revenue - COGS)
         gross_profit = revenue_value - cogs
@@ -643,26 +641,15 @@ def balance_sheet_view(request):
         elif account.account_type == "expense":
             expenses += total_amount
 
-    # Fetch SaleDetails within the date range
-    sales_details = SaleDetail.objects.filter(
-        sale__trans_date__range=(start_date, end_date)
-    )
-
-    # Calculate Revenue: Sum of (selling price * quantity sold)
-    sales_revenue = (
-        sales_details.annotate(selling_price=F("product_volume__price")).aggregate(
-            total_revenue=Sum(F("selling_price") * F("quantity"))
-        )["total_revenue"]
-        or 0
-    )
-
-    # Calculate Cost of Goods Sold (COGS)
-    cogs = (
-        sales_details.annotate(cost_price=F("product_volume__cost")).aggregate(
-            total_cogs=Sum(F("cost_price") * F("quantity"))
-        )["total_cogs"]
-        or 0
+    # Revenue and COGS within the date range from the daily sales rollups
+    sales_totals = DailySalesSummary.objects.filter(
+        date__range=(start_date, end_date)
+    ).aggregate(
+        total_revenue=Sum("revenue"),
+        total_cogs=Sum("cogs_total"),
     )
+    sales_revenue = Decimal(str(round(sales_totals["total_revenue"] or 0, 2)))
+    cogs = Decimal(str(round(sales_totals["total_cogs"] or 0, 2)))
 
     # Calculate Gross Profit (Sales Revenue - COGS)
     gross_profit = sales_revenue - cogs
@@ -0,0 +1,355 @@
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.authentication.models import Profile
+from apps.customers.models import Customer
+from apps.finance.models import ChartOfAccounts, Transaction
+from apps.inventory.models import Inventory
+from apps.orders.models import Cart, CartItem
+from apps.products.cards import rebuild_cards
+from apps.products.models import Category, Product, ProductVolume, Volume
+from apps.sales.models import Sale, SaleDetail
+from apps.sales.rollups import rebuild_rollups
+
+BENCHMARK_USERNAME = "benchmark"
+BENCHMARK_PASSWORD = "benchmark-password"
+# Stock given to every product so repeated POS posts never run out
+SEED_STOCK = 1_000_000
+BATCH_SIZE = 5000
+
+
+# =================================== Dataset seeding ===================================
+def seed_dataset(products=500, sales=10000, lines_per_sale=5, days=365, stdout=None):
+    """
+    Bulk insert a synthetic catalog, sales history and ledger. Model save()
+    hooks (image uploads, stock alerts) are bypassed on purpose; stored sale
+    aggregates, product cards and the daily rollups are filled directly.
+    """
+    rng = random.Random(42)
+    today = date.today()
+
+    def log(message):
+        if stdout:
+            stdout.write(message)
+
+    category = Category.objects.create(name="Benchmark")
+    volumes = [Volume.objects.get_or_create(ml=ml)[0] for ml in (30, 50, 100)]
+
+    Product.objects.bulk_create(
+        [
+            Product(
+                name=f"Benchmark Product {i}",
+                description="Benchmark product",
+                status="ACTIVE",
+                category=category,
+            )
+            for i in range(products)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    product_ids = list(
+        Product.objects.filter(category=category).values_list("id", flat=True)
+    )
+    Inventory.objects.bulk_create(
+        [
+            Inventory(product_id=product_id, quantity=SEED_STOCK)
+            for product_id in product_ids
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    ProductVolume.objects.bulk_create(
+        [
+            ProductVolume(
+                product_id=product_id,
+                volume=volume,
+                cost=Decimal(10 * (n + 1)),
+                price=Decimal(15 * (n + 1)),
+            )
+            for product_id in product_ids
+            for n, volume in enumerate(volumes)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    product_volumes = list(
+        ProductVolume.objects.filter(product_id__in=product_ids).values_list(
+            "id", "product_id", "cost", "price"
+        )
+    )
+    rebuild_cards()
+    log(f"Seeded {len(product_ids)} products and {len(product_volumes)} volumes.")
+
+    Customer.objects.bulk_create(
+        [
+            Customer(first_name=f"First{i}", last_name=f"Last{i}")
+            for i in range(max(products // 10, 1))
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    customer_ids = list(Customer.objects.values_list("id", flat=True))
+
+    created = 0
+    while created < sales:
+        chunk = min(BATCH_SIZE, sales - created)
+        sale_lines = []
+        sale_objects = []
+        for _ in range(chunk):
+            # (volume id, product id, cost, price, quantity)
+            lines = [
+                (volume_id, product_id, cost, price, rng.randint(1, 5))
+                for volume_id, product_id, cost, price in rng.sample(
+                    product_volumes, min(lines_per_sale, len(product_volumes))
+                )
+            ]
+            revenue = sum(float(line[3]) * line[4] for line in lines)
+            cogs = sum(float(line[2]) * line[4] for line in lines)
+            sale_lines.append(lines)
+            sale_objects.append(
+                Sale(
+                    customer_id=rng.choice(customer_ids),
+                    trans_date=today - timedelta(days=rng.randint(0, days - 1)),
+                    sub_total=revenue,
+                    grand_total=revenue,
+                    amount_payed=revenue,
+                    item_count=sum(line[4] for line in lines),
+                    cogs_total=cogs,
+                    profit_total=revenue - cogs,
+                )
+            )
+        Sale.objects.bulk_create(sale_objects)
+        SaleDetail.objects.bulk_create(
+            [
+                SaleDetail(
+                    sale=sale,
+                    product_id=product_id,
+                    product_volume_id=volume_id,
+                    price=float(price),
+                    unit_cost=cost,
+                    quantity=quantity,
+                    total_detail=float(price) * quantity,
+                )
+                for sale, lines in zip(sale_objects, sale_lines)
+                for volume_id, product_id, cost, price, quantity in lines
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        created += chunk
+        log(f"Seeded {created} of {sales} sales...")
+
+    rebuild_rollups(today - timedelta(days=days), today)
+
+    accounts = ChartOfAccounts.objects.bulk_create(
+        [
+            ChartOfAccounts(
+                account_name=name, account_type=account_type, account_number=number
+            )
+            for name, account_type, number in (
+                ("Cash", "asset", "1000"),
+                ("Payables", "liability", "2000"),
+                ("Capital", "equity", "3000"),
+                ("Sales Revenue", "revenue", "4000"),
+                ("Rent", "expense", "5000"),
+            )
+        ]
+    )
+    Transaction.objects.bulk_create(
+        [
+            Transaction(
+                account=rng.choice(accounts),
+                amount=Decimal(rng.randint(100, 10000)),
+                transaction_type=rng.choice(("debit", "credit")),
+                transaction_date=today - timedelta(days=rng.randint(0, days - 1)),
+            )
+            for _ in range(max(sales // 10, 1))
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    log("Seeded the ledger and rebuilt the daily rollups.")
+
+
+def get_benchmark_user():
+    user = User.objects.filter(username=BENCHMARK_USERNAME).first()
+    if user is None:
+        user = User.objects.create_user(BENCHMARK_USERNAME, password=BENCHMARK_PASSWORD)
+        # An absolute URL keeps the navbar avatar from needing Cloudinary
+        Profile.objects.create(
+            user=user,
+            role="administrator",
+            bio="",
+            avatar="https://example.com/avatar.jpg",
+        )
+    return user
+
+
+# =================================== Scenarios ===================================
+def _fill_cart(user, items=10):
+    cart, _ = Cart.objects.get_or_create(user=user)
+    cart.items.all().delete()
+    CartItem.objects.bulk_create(
+        [
+            CartItem(cart=cart, product_id=product_id, volume_id=volume_id, quantity=1)
+            for volume_id, product_id in ProductVolume.objects.values_list(
+                "id", "product_id"
+            )[:items]
+        ]
+    )
+
+
+def _pos_sale_data():
+    customer_id = Customer.objects.values_list("id", flat=True).first()
+    products = [
+        json.dumps(
+            {
+                "id": f"{product_id}-{volume_id}",
+                "price": str(price),
+                "quantity": 1,
+                "total_product": str(price),
+            }
+        )
+        for volume_id, product_id, price in ProductVolume.objects.values_list(
+            "id", "product_id", "price"
+        )[:5]
+    ]
+    return {
+        "customer": customer_id,
+        "trans_date": date.today().isoformat(),
+        "sub_total": 0,
+        "grand_total": 0,
+        "products": products,
+    }
+
+
+def get_scenarios(user):
+    """
+    The hot paths to time, as ``(name, method, url, data, setup)``. ``data``
+    and ``setup`` are callables so they never count towards the timings.
+    """
+    today = date.today()
+    period = {
+        "start_date": (today - timedelta(days=365)).isoformat(),
+        "end_date": today.isoformat(),
+    }
+    account_id = ChartOfAccounts.objects.values_list("id", flat=True).first()
+    checkout_data = {
+        "first_name": "Bench",
+        "last_name": "Mark",
+        "email": "bench@example.com",
+        "phone": "+256700000000",
+        "address": "Kampala",
+    }
+    return [
+        ("sales_add_view", "post", reverse("sales:sales_add"), _pos_sale_data, None),
+        ("sales_list_view", "get", reverse("sales:sales_list"), None, None),
+        (
+            "sales_report_view",
+            "get",
+            reverse("sales:sales_report"),
+            lambda: period,
+            None,
+        ),
+        ("dashboard", "get", reverse("dashboard"), None, None),
+        ("index", "get", reverse("users-home"), None, None),
+        (
+            "checkout_view",
+            "post",
+            reverse("orders:checkout"),
+            lambda: checkout_data,
+            lambda: _fill_cart(user),
+        ),
+        (
+            "ledger_report_view",
+            "get",
+            reverse("finance:ledger_report"),
+            lambda: {"account_id": account_id, **period},
+            None,
+        ),
+        (
+            "balance_sheet_view",
+            "get",
+            reverse("finance:balance_sheet"),
+            lambda: period,
+            None,
+        ),
+    ]
+
+
+def run_scenario(client, method, url, data, setup, repeat):
+    """
+    Time ``repeat`` requests and return the median wall time, the largest
+    query count and the tracemalloc peak of one extra, separately traced run.
+    """
+    request = getattr(client, method)
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        payload = data() if data else None
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = request(url, payload)
+            timings.append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            raise RuntimeError(
+                f"{method.upper()} {url} returned {response.status_code}"
+            )
+        queries = max(queries, len(captured.captured_queries))
+
+    if setup:
+        setup()
+    payload = data() if data else None
+    tracemalloc.start()
+    request(url, payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_ms": round(statistics.median(timings) * 1000, 2),
+        "queries": queries,
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(repeat=5, only=None):
+    user = get_benchmark_user()
+    client = Client()
+    client.force_login(user)
+    return {
+        name: run_scenario(client, method, url, data, setup, repeat)
+        for name, method, url, data, setup in get_scenarios(user)
+        if not only or name in only
+    }
+
+
+# =================================== Baseline comparison ===================================
+def compare_results(results, baseline, tolerance=0.25):
+    """
+    Compare ``results`` with a baseline run. A view regresses when it runs
+    more queries than the baseline, or its wall time grows by more than
+    ``tolerance``. Returns ``(rows, regressions)``.
+    """
+    rows, regressions = [], []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            rows.append((name, current, None, "new"))
+            continue
+        problems = []
+        if current["queries"] > previous["queries"]:
+            problems.append(f"queries {previous['queries']} -> {current['queries']}")
+        if current["wall_ms"] > previous["wall_ms"] * (1 + tolerance):
+            problems.append(f"wall {previous['wall_ms']}ms -> {current['wall_ms']}ms")
+        rows.append((name, current, previous, "; ".join(problems) or "ok"))
+        if problems:
+            regressions.append(name)
+    return rows, regressions
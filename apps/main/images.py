@@ -0,0 +1,245 @@
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from io import BytesIO
+
+from cloudinary.uploader import upload
+from cloudinary.utils import generate_transformation_string
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from PIL import Image
+
+from .tasks import run_in_background
+
+logger = logging.getLogger(__name__)
+
+
+# =================================== Storage backends ===================================
+class ImageStorage(ABC):
+    """
+    Where processed images end up. ``store`` saves an image along with a
+    thumbnail for each of ``sizes`` and returns the absolute URL saved on the
+    model; ``thumbnail_url`` turns that URL into the URL of one thumbnail.
+    """
+
+    @abstractmethod
+    def store(self, data, folder, name, sizes):
+        pass
+
+    def thumbnail_url(self, url, size):
+        return url
+
+
+class CloudinaryImageStorage(ImageStorage):
+    """Uploads to Cloudinary, which derives the thumbnails at upload time."""
+
+    @staticmethod
+    def _transformation(size):
+        return {"width": size, "height": size, "crop": "limit"}
+
+    def store(self, data, folder, name, sizes):
+        result = upload(
+            BytesIO(data),
+            folder=folder,
+            eager=[self._transformation(size) for size in sizes],
+        )
+        return result["url"]
+
+    def thumbnail_url(self, url, size):
+        # Built by the SDK so it matches the eager derivative byte for byte
+        transformation, _ = generate_transformation_string(**self._transformation(size))
+        return url.replace("/upload/", f"/upload/{transformation}/", 1)
+
+
+class LocalImageStorage(ImageStorage):
+    """
+    Keeps images and their thumbnails on local disk, for tests and installs
+    without Cloudinary. Thumbnails sit next to the image as ``<name>_<size>``.
+    Files carry no extension: CloudinaryField drops it from absolute URLs.
+    """
+
+    def __init__(self, location=None, base_url=None):
+        self.storage = FileSystemStorage(
+            location=location or settings.IMAGE_LOCAL_DIR,
+            base_url=base_url or settings.IMAGE_LOCAL_URL,
+        )
+
+    def store(self, data, folder, name, sizes):
+        stem = os.path.splitext(name)[0]
+        name = self.storage.save(os.path.join(folder, stem), ContentFile(data))
+        for size in sizes:
+            thumbnail = f"{name}_{size}"
+            # The name must match thumbnail_url, so replace any older file
+            self.storage.delete(thumbnail)
+            self.storage.save(thumbnail, ContentFile(resize_image(data, size)))
+        return self.storage.url(name)
+
+    def thumbnail_url(self, url, size):
+        # Images stored elsewhere, e.g. before the switch, have no thumbnails
+        if not url.startswith(self.storage.base_url):
+            return url
+        return f"{url}_{size}"
+
+
+def get_image_storage():
+    return import_string(settings.IMAGE_STORAGE)()
+
+
+def thumbnail_url(url, size):
+    """URL of the ``size`` thumbnail of ``url``, if that size is generated."""
+    if not url or size not in settings.IMAGE_THUMBNAIL_SIZES:
+        return url
+    return get_image_storage().thumbnail_url(url, size)
+
+
+def resize_image(data, size):
+    """``data`` shrunk to fit a ``size`` square, or unchanged if it already does."""
+    img = Image.open(BytesIO(data))
+    if img.width <= size and img.height <= size:
+        return data
+    image_format = img.format
+    img.thumbnail((size, size))
+    output = BytesIO()
+    img.save(output, format=image_format)
+    return output.getvalue()
+
+
+# =================================== Upload pipeline ===================================
+def get_pending_storage():
+    # Uploaded originals wait here until the background worker has stored them
+    return FileSystemStorage(location=settings.IMAGE_PENDING_DIR)
+
+
+def take_upload(instance, field_name):
+    """
+    Return the file just uploaded to ``instance.field_name``, or None. The
+    field is put back to its stored value (or default) so the save that
+    follows does not upload anything; ``schedule_image`` replaces it later.
+    """
+    value = getattr(instance, field_name)
+    if not isinstance(value, UploadedFile):
+        return None
+
+    stored = None
+    if instance.pk:
+        stored = (
+            type(instance)
+            .objects.filter(pk=instance.pk)
+            .values_list(field_name, flat=True)
+            .first()
+        )
+    field = instance._meta.get_field(field_name)
+    setattr(instance, field_name, stored or field.get_default())
+    return value
+
+
+def _task_name(pending_name):
+    # Sidecar recording where a pending original goes, so a sweep can retry it
+    return f"{pending_name}.json"
+
+
+def schedule_image(instance, field_name, upload_file, folder, max_size=None):
+    """
+    Write ``upload_file`` to local disk and store it through the image
+    storage on the background pool once ``instance`` commits.
+    """
+    upload_file.seek(0)
+    pending_storage = get_pending_storage()
+    pending_name = pending_storage.save(os.path.basename(upload_file.name), upload_file)
+    task = {
+        "model_label": instance._meta.label,
+        "pk": instance.pk,
+        "field_name": field_name,
+        "folder": folder,
+        "max_size": max_size,
+    }
+    # A sidecar left by an older upload of the same name would be renamed
+    pending_storage.delete(_task_name(pending_name))
+    pending_storage.save(_task_name(pending_name), ContentFile(json.dumps(task)))
+    run_in_background(process_image, pending_name=pending_name, **task)
+
+
+def process_image(model_label, pk, field_name, pending_name, folder, max_size=None):
+    """
+    Store a pending original, shrunk to ``max_size`` when given, with its
+    thumbnails, then point ``field_name`` of the instance at the final URL.
+    Returns the URL, or None when the instance is gone or storing failed.
+    The pending original is deleted either way.
+    """
+    pending_storage = get_pending_storage()
+    try:
+        instance = apps.get_model(model_label).objects.filter(pk=pk).first()
+        if instance is None:
+            logger.warning(f"Dropped {pending_name}: {model_label} {pk} is gone")
+            return None
+
+        with pending_storage.open(pending_name) as pending:
+            data = pending.read()
+        if max_size:
+            data = resize_image(data, max_size)
+        url = get_image_storage().store(
+            data,
+            folder,
+            os.path.basename(pending_name),
+            settings.IMAGE_THUMBNAIL_SIZES,
+        )
+        setattr(instance, field_name, url)
+        # A regular save, so card refreshes and cache invalidation still run
+        instance.save(update_fields=[field_name])
+        logger.info(f"Stored {field_name} of {model_label} {pk}: {url}")
+        return url
+    except Exception:
+        # The instance keeps its previous image, or none if it is new
+        logger.exception(
+            f"Could not store {field_name} of {model_label} {pk} from {pending_name}"
+        )
+        return None
+    finally:
+        pending_storage.delete(pending_name)
+        pending_storage.delete(_task_name(pending_name))
+
+
+def sweep_pending_images(min_age):
+    """
+    Process pending originals older than ``min_age`` (a timedelta), whose
+    background task was lost to a restart, and delete files that have no
+    task to go with. Returns ``(stored, failed, deleted)`` counts.
+    """
+    pending_storage = get_pending_storage()
+    if not pending_storage.exists(""):
+        return 0, 0, 0
+    cutoff = timezone.now() - min_age
+    stored = failed = deleted = 0
+
+    _, names = pending_storage.listdir("")
+    for name in sorted(names):
+        # Sidecars go with their original, and recent uploads may still have
+        # a queued or running task
+        if (
+            not pending_storage.exists(name)
+            or pending_storage.get_modified_time(name) > cutoff
+        ):
+            continue
+        if name.endswith(".json"):
+            if not pending_storage.exists(name[: -len(".json")]):
+                pending_storage.delete(name)
+                deleted += 1
+            continue
+        if not pending_storage.exists(_task_name(name)):
+            pending_storage.delete(name)
+            deleted += 1
+            continue
+
+        with pending_storage.open(_task_name(name)) as sidecar:
+            task = json.load(sidecar)
+        if process_image(pending_name=name, **task):
+            stored += 1
+        else:
+            failed += 1
+    return stored, failed, deleted
@@ -0,0 +1,139 @@
+import json
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from apps.main.benchmarks import compare_results, run_benchmarks, seed_dataset
+from apps.products.models import Product
+
+BENCHMARKS_DIR = settings.BASE_DIR / "benchmarks"
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and time the sales, checkout, report "
+        "and dashboard views through the test client. Records wall time, query "
+        "count and peak memory per view and compares them with a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=500)
+        parser.add_argument("--sales", type=int, default=10000)
+        parser.add_argument("--lines-per-sale", type=int, default=5)
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="Timed requests per view."
+        )
+        parser.add_argument(
+            "--only", nargs="+", help="Only run the named views (e.g. dashboard)."
+        )
+        parser.add_argument(
+            "--output",
+            default=str(BENCHMARKS_DIR / "latest.json"),
+            help="Where to write this run's results.",
+        )
+        parser.add_argument(
+            "--baseline",
+            default=str(BENCHMARKS_DIR / "baseline.json"),
+            help="Results to compare against, if the file exists.",
+        )
+        parser.add_argument(
+            "--save-baseline",
+            action="store_true",
+            help="Also store this run as the new baseline.",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="Allowed wall time growth over the baseline (default: 0.25).",
+        )
+        parser.add_argument(
+            "--fail-on-regression",
+            action="store_true",
+            help="Exit with an error when any view regresses.",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the test database and reuse its dataset on the next run.",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False, keepdb=options["keepdb"]
+        )
+        try:
+            if not Product.objects.exists():
+                seed_dataset(
+                    products=options["products"],
+                    sales=options["sales"],
+                    lines_per_sale=options["lines_per_sale"],
+                    stdout=self.stdout,
+                )
+            # Receipt PDFs render on a background thread after checkout; keep
+            # that work from competing with the timed requests
+            with mock.patch("apps.sales.views.schedule_receipt"):
+                results = run_benchmarks(options["repeat"], options["only"])
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+
+        report = {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            "dataset": {
+                "products": options["products"],
+                "sales": options["sales"],
+                "lines_per_sale": options["lines_per_sale"],
+            },
+            "repeat": options["repeat"],
+            "results": results,
+        }
+        self._write(Path(options["output"]), report)
+        if options["save_baseline"]:
+            self._write(Path(options["baseline"]), report)
+
+        baseline_path = Path(options["baseline"])
+        if options["save_baseline"] or not baseline_path.exists():
+            for name, result in results.items():
+                self.stdout.write(self._format(name, result))
+            return
+
+        baseline = json.loads(baseline_path.read_text())
+        if baseline.get("dataset") != report["dataset"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Baseline dataset {baseline.get('dataset')} differs from this run."
+                )
+            )
+        rows, regressions = compare_results(
+            results, baseline.get("results", {}), options["tolerance"]
+        )
+        for name, current, previous, status in rows:
+            line = f"{self._format(name, current)}  [{status}]"
+            style = self.style.ERROR if name in regressions else self.style.SUCCESS
+            self.stdout.write(style(line))
+
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"Regressions in: {', '.join(regressions)}")
+
+    def _write(self, path, report):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        self.stdout.write(f"Results written to {path}")
+
+    @staticmethod
+    def _format(name, result):
+        return (
+            f"{name:<22} {result['wall_ms']:>10.2f} ms {result['queries']:>6} queries "
+            f"{result['peak_kb']:>10.1f} KB peak"
+        )
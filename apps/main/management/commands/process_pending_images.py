@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.main.images import sweep_pending_images
+
+
+class Command(BaseCommand):
+    help = (
+        "Store image uploads still waiting in IMAGE_PENDING_DIR, e.g. after a "
+        "restart dropped their background task, and delete orphaned files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=int,
+            default=30,
+            help="Only touch files older than this many minutes (default: 30).",
+        )
+
+    def handle(self, *args, **options):
+        stored, failed, deleted = sweep_pending_images(
+            timedelta(minutes=max(options["min_age"], 0))
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Stored {stored} pending image(s), {failed} failed, "
+                f"deleted {deleted} orphaned file(s)."
+            )
+        )
@@ -0,0 +1,68 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# Data the cached metrics are computed from; writes bump the matching group
+SALES = "sales"
+CATALOG = "catalog"
+ORDERS = "orders"
+ACCOUNTS = "accounts"
+
+
+# =================================== Metric versions ===================================
+def _version_key(group):
+    return f"metrics-version:{group}"
+
+
+def get_versions(groups):
+    """
+    Current version of each group. A missing version (never set, or evicted)
+    starts from the clock so it can never match entries cached before.
+    """
+    keys = {group: _version_key(group) for group in groups}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for group, key in keys.items():
+        if key not in found:
+            cache.add(key, time.time_ns(), None)
+            found[key] = cache.get(key)
+        versions[group] = found[key]
+    return versions
+
+
+def _bump(groups):
+    for group in groups:
+        try:
+            cache.incr(_version_key(group))
+        except ValueError:
+            cache.set(_version_key(group), time.time_ns(), None)
+    logger.debug(f"Invalidated cached metrics for {', '.join(groups)}")
+
+
+def invalidate_metrics(*groups):
+    """
+    Invalidate every metric computed from ``groups`` once the current
+    transaction commits, so no request can cache the data being replaced.
+    """
+    transaction.on_commit(lambda: _bump(groups))
+
+
+# =================================== Cached metrics ===================================
+def cached_metric(name, compute, groups, timeout=None):
+    """
+    Return the cached value of ``name``, calling ``compute()`` on a miss.
+    The key carries the version of each group, so bumping a group makes
+    every worker miss and recompute on its next request.
+    """
+    versions = get_versions(groups)
+    key = f"metrics:{name}:" + ":".join(str(versions[group]) for group in groups)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout or settings.METRICS_CACHE_TIMEOUT)
+    return value
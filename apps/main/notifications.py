@@ -0,0 +1,100 @@
+import hashlib
+
+from django.db.models import F
+
+from apps.authentication.models import Contact
+from apps.inventory.models import Inventory
+from apps.orders.models import Order
+
+from .metrics import ACCOUNTS, CATALOG, ORDERS, cached_metric, get_versions
+
+# Entries listed under each navbar badge
+NOTIFICATION_ITEMS = 5
+OPEN_ORDER_STATUSES = ("Pending", "Shipped")
+
+# Each counter is cached under the group its rows belong to, so an order
+# only recomputes the order counter
+COUNTER_GROUPS = {
+    "orders": ORDERS,
+    "low_stock": CATALOG,
+    "feedback": ACCOUNTS,
+}
+
+
+# =================================== Counters ===================================
+def _open_orders():
+    orders = Order.objects.filter(status__in=OPEN_ORDER_STATUSES)
+    newest = orders.select_related("customer").order_by("-created_at", "-id")
+    return {
+        "count": orders.count(),
+        "items": [
+            {
+                "id": order.id,
+                "customer": order.customer.get_full_name(),
+                "status": order.status,
+                "created_at": order.created_at.isoformat(),
+            }
+            for order in newest[:NOTIFICATION_ITEMS]
+        ],
+    }
+
+
+def _low_stock():
+    stock = Inventory.objects.filter(quantity__lte=F("low_stock_threshold"))
+    lowest = stock.order_by("quantity", "product__name").values(
+        "product_id", "product__name", "quantity"
+    )
+    return {
+        "count": stock.count(),
+        "items": [
+            {
+                "id": row["product_id"],
+                "name": row["product__name"],
+                "quantity": row["quantity"],
+            }
+            for row in lowest[:NOTIFICATION_ITEMS]
+        ],
+    }
+
+
+def _unvalidated_feedback():
+    feedback = Contact.objects.filter(is_valid=False)
+    newest = feedback.order_by("-created_at", "-id").values("id", "name", "created_at")
+    return {
+        "count": feedback.count(),
+        "items": [
+            {**row, "created_at": row["created_at"].isoformat()}
+            for row in newest[:NOTIFICATION_ITEMS]
+        ],
+    }
+
+
+COUNTERS = {
+    "orders": _open_orders,
+    "low_stock": _low_stock,
+    "feedback": _unvalidated_feedback,
+}
+
+
+# =================================== Service ===================================
+def get_notifications_etag():
+    """
+    Tag for the current counters, built from the cached group versions alone
+    so a poll with a matching ``If-None-Match`` never touches the database.
+    """
+    versions = get_versions(COUNTER_GROUPS.values())
+    raw = ":".join(str(versions[group]) for group in COUNTER_GROUPS.values())
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_notifications():
+    """
+    Count and newest ``NOTIFICATION_ITEMS`` entries of the open orders, low
+    stock products and unvalidated feedback. Each counter is recomputed once
+    after an ``Order``, ``Inventory`` or ``Contact`` write and shared by
+    every staff member until the next one.
+    """
+    return {
+        name: cached_metric(f"notifications:{name}", compute, [COUNTER_GROUPS[name]])
+        for name, compute in COUNTERS.items()
+    }
@@ -0,0 +1,54 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+# Largest value a BigAutoField primary key can hold
+MAX_ID = 2**63 - 1
+
+# Receipt numbers look like "KLA-20240101-000123"
+RECEIPT_NUMBER_RE = re.compile(r"^(?=.*\d)[A-Za-z0-9]+(-[A-Za-z0-9]+)+$")
+
+
+# =================================== List search planner ===================================
+def name_lookup():
+    """
+    Lookup used for customer names. PostgreSQL has trigram indexes on the
+    upper-cased names, so substring matches stay indexed there; other
+    databases fall back to a prefix match.
+    """
+    return "icontains" if connection.vendor == "postgresql" else "istartswith"
+
+
+def build_search_filter(search_query, customer_field="customer", receipt_field=None):
+    """
+    Turn a list search box query into an index-friendly ``Q``.
+
+    - Numbers (optionally prefixed with ``#``) match the primary key exactly,
+      and the receipt number when ``receipt_field`` is given.
+    - Receipt-shaped tokens match ``receipt_field`` exactly.
+    - One word matches the start of the customer's first or last name; two or
+      more words match the first name and the last name together.
+    """
+    search_query = search_query.strip()
+    if not search_query:
+        return Q()
+
+    token = search_query.lstrip("#")
+    if token.isdigit():
+        query = Q(pk=int(token)) if int(token) <= MAX_ID else Q(pk__in=[])
+        if receipt_field:
+            query |= Q(**{receipt_field: token})
+        return query
+
+    if receipt_field and RECEIPT_NUMBER_RE.match(search_query):
+        return Q(**{receipt_field: search_query.upper()})
+
+    lookup = name_lookup()
+    first_name = f"{customer_field}__first_name__{lookup}"
+    last_name = f"{customer_field}__last_name__{lookup}"
+
+    words = search_query.split()
+    if len(words) == 1:
+        return Q(**{first_name: words[0]}) | Q(**{last_name: words[0]})
+    return Q(**{first_name: words[0], last_name: " ".join(words[1:])})
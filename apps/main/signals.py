@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.authentication.models import Contact, Profile
+from apps.inventory.models import Inventory
+from apps.orders.models import Order
+from apps.products.models import Category, Product, ProductImage, ProductVolume
+from apps.sales.models import Sale, SaleDetail
+
+from .metrics import ACCOUNTS, CATALOG, ORDERS, SALES, invalidate_metrics
+
+
+@receiver(post_save, sender=Sale)
+@receiver(post_delete, sender=Sale)
+@receiver(post_save, sender=SaleDetail)
+@receiver(post_delete, sender=SaleDetail)
+def invalidate_sales_metrics(sender, **kwargs):
+    invalidate_metrics(SALES)
+
+
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=ProductVolume)
+@receiver(post_delete, sender=ProductVolume)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_catalog_metrics(sender, **kwargs):
+    invalidate_metrics(CATALOG)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def invalidate_order_metrics(sender, **kwargs):
+    invalidate_metrics(ORDERS)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+def invalidate_account_metrics(sender, **kwargs):
+    invalidate_metrics(ACCOUNTS)
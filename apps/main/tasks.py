@@ -0,0 +1,39 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Shared pool for work that should not hold up the request/response cycle
+executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "BACKGROUND_WORKERS", 2),
+    thread_name_prefix="background",
+)
+
+
+def _run_task(func, args, kwargs):
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception(f"Background task {func.__name__} failed")
+    finally:
+        close_old_connections()
+
+
+def run_in_background(func, *args, **kwargs):
+    """
+    Run ``func(*args, **kwargs)`` on the background pool once the current
+    transaction commits. With ``BACKGROUND_TASKS_EAGER`` set the task runs
+    inline instead, which keeps tests and management commands deterministic.
+    """
+
+    def submit():
+        if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+            func(*args, **kwargs)
+        else:
+            executor.submit(_run_task, func, args, kwargs)
+
+    transaction.on_commit(submit)
@@ -0,0 +1,228 @@
+import os
+import re
+import tempfile
+from collections import Counter
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.authentication.models import Profile
+from apps.customers.models import Customer
+from apps.inventory.models import Inventory
+from apps.products.models import Product, ProductImage, ProductVolume, Volume
+from apps.sales.models import Sale
+from apps.sales.utils import post_sale_lines
+
+# Literals that vary between otherwise identical queries
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+# =================================== Query fingerprints ===================================
+def fingerprint(sql):
+    """Normalize ``sql`` so queries differing only in their parameters match."""
+    sql = STRING_LITERAL_RE.sub("?", sql)
+    sql = NUMBER_LITERAL_RE.sub("?", sql)
+    sql = IN_LIST_RE.sub("(?)", sql)
+    return WHITESPACE_RE.sub(" ", sql).strip()
+
+
+def repeated_fingerprints(queries):
+    """``(count, fingerprint)`` for every query shape that ran more than once."""
+    counts = Counter(fingerprint(query["sql"]) for query in queries)
+    return [(count, sql) for sql, count in counts.most_common() if count > 1]
+
+
+# =================================== Query budget test case ===================================
+# The DatabaseCache fallback used when REDIS_URL is unset
+DATABASE_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    }
+}
+
+
+# Budgets assume Redis or LocMem, where cache round trips are not queries;
+# subclasses under override_settings(CACHES=DATABASE_CACHES) cover the fallback
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class QueryBudgetTestCase(TestCase):
+    """
+    Base class for per-view query budgets.
+
+    ``check_budget`` requests a URL name at every fixture size, growing the
+    data in between, and fails when the view runs more queries than its
+    budget or when its query count grows with the data. Failures list the
+    repeated SQL fingerprints, which point straight at the N+1.
+    """
+
+    fixture_sizes = (1, 10)
+    role = "administrator"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("budget", password="budget-password")
+        # An absolute URL keeps the navbar avatar from needing Cloudinary
+        Profile.objects.create(
+            user=cls.user,
+            role=cls.role,
+            bio="",
+            avatar="https://example.com/avatar.jpg",
+        )
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def check_budget(self, url_name, budget, grow, args=None, params=None):
+        """
+        Call ``grow(size)`` for each of ``fixture_sizes`` so the data holds
+        ``size`` rows, then GET ``url_name`` with an empty cache and compare
+        its query count.
+        """
+        url = reverse(url_name, args=args)
+        # Let one-off writes, such as creating the user's cart, happen unmeasured
+        self.client.get(url, params)
+        counts = {}
+        for size in self.fixture_sizes:
+            grow(size)
+            # Measure cold requests so cached results cannot hide a query
+            cache.clear()
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url, params)
+            self.assertLess(
+                response.status_code, 400, f"{url_name} returned {response.status_code}"
+            )
+            counts[size] = len(captured.captured_queries)
+
+            if counts[size] > budget:
+                self.fail(
+                    self._report(
+                        f"{url_name} ran {counts[size]} queries with {size} row(s), "
+                        f"over its budget of {budget}.",
+                        captured.captured_queries,
+                    )
+                )
+
+        smallest, largest = min(counts), max(counts)
+        if counts[largest] != counts[smallest]:
+            self.fail(
+                self._report(
+                    f"{url_name} ran {counts[smallest]} queries with {smallest} "
+                    f"row(s) but {counts[largest]} with {largest}.",
+                    captured.captured_queries,
+                )
+            )
+        return counts
+
+    def grow_sales(self, size):
+        """
+        Post one sale a day, going back from today, until ``size`` sales
+        exist. Sales go through ``post_sale_lines`` so the stored totals and
+        daily rollups the reports read are filled as in production.
+        """
+        if not hasattr(self, "sale_volume"):
+            product = Product.objects.create(
+                name="Budget Sale Product", description="Sold", status="ACTIVE"
+            )
+            Inventory.objects.create(product=product, quantity=10000)
+            self.sale_volume = ProductVolume.objects.create(
+                product=product,
+                volume=Volume.objects.get_or_create(ml=100)[0],
+                cost=Decimal(30),
+                price=Decimal(50),
+            )
+        while Sale.objects.count() < size:
+            n = Sale.objects.count()
+            customer = Customer.objects.create(first_name="Sale", last_name=f"{n}")
+            with transaction.atomic():
+                sale = Sale.objects.create(
+                    customer=customer,
+                    trans_date=date.today() - timedelta(days=n),
+                    sub_total=100,
+                    grand_total=100,
+                    amount_payed=100,
+                )
+                post_sale_lines(
+                    sale,
+                    [
+                        {
+                            "product_id": self.sale_volume.product_id,
+                            "volume_id": self.sale_volume.id,
+                            "price": 50.0,
+                            "quantity": 2,
+                            "total_detail": 100.0,
+                        }
+                    ],
+                )
+
+    def make_product(self, category, prices):
+        """
+        Create an active product with a default image in ``category``, plus one
+        volume per ``(volume, cost, price)`` in ``prices``. Returns the product
+        and its volumes, with the product card already refreshed.
+        """
+        # Cards are refreshed when the writes commit
+        with self.captureOnCommitCallbacks(execute=True):
+            product = Product.objects.create(
+                name=f"Budget Product {Product.objects.count()}",
+                description="Budget product",
+                status="ACTIVE",
+                category=category,
+            )
+            # An absolute URL keeps the Cloudinary field from uploading anything
+            ProductImage.objects.create(
+                product=product, image="https://example.com/p.jpg", is_default=True
+            )
+            volumes = [
+                ProductVolume.objects.create(
+                    product=product,
+                    volume=volume,
+                    cost=Decimal(cost),
+                    price=Decimal(price),
+                )
+                for volume, cost, price in prices
+            ]
+        return product, volumes
+
+    @staticmethod
+    def _report(message, queries):
+        lines = [message]
+        repeated = repeated_fingerprints(queries)
+        if repeated:
+            lines.append("Repeated queries:")
+            lines.extend(f"  {count}x {sql}" for count, sql in repeated)
+        return "\n".join(lines)
+
+
+# =================================== Image uploads ===================================
+class LocalImagesMixin:
+    """
+    Store images with LocalImageStorage under a temporary directory, exposed
+    as ``pending_dir`` and ``image_dir``, and run background tasks inline.
+    """
+
+    def setUp(self):
+        super().setUp()
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.pending_dir = os.path.join(media.name, "pending")
+        self.image_dir = os.path.join(media.name, "images")
+        overrides = override_settings(
+            IMAGE_STORAGE="apps.main.images.LocalImageStorage",
+            IMAGE_PENDING_DIR=self.pending_dir,
+            IMAGE_LOCAL_DIR=self.image_dir,
+            IMAGE_LOCAL_URL="http://testserver/media/images/",
+            BACKGROUND_TASKS_EAGER=True,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
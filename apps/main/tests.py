@@ -1 +1,336 @@
-# Create your tests here.
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from cloudinary.utils import cloudinary_url
+from django.db import connection
+from django.db.models import Q
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from apps.authentication.models import Contact
+from apps.customers.models import Customer
+from apps.inventory.models import Inventory
+from apps.orders.models import Order
+from apps.products.models import Category, Product, Volume
+from apps.sales.models import DailySalesSummary, Sale
+
+from .images import CloudinaryImageStorage
+from .search import build_search_filter
+from .testing import DATABASE_CACHES, QueryBudgetTestCase
+from .utils import get_sales_kpis
+
+
+# =================================== Query budgets ===================================
+class DashboardQueryBudgetTests(QueryBudgetTestCase):
+    # The analytics block only queries once there is a sale before today
+    fixture_sizes = (2, 10)
+
+    def test_dashboard(self):
+        self.check_budget("dashboard", 11, self.grow_sales)
+
+    def test_dashboard_refresh_served_from_cache(self):
+        self.grow_sales(10)
+        self.client.get(reverse("dashboard"))
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(reverse("dashboard"))
+        scanned = [
+            query["sql"]
+            for query in captured.captured_queries
+            if "sale" in query["sql"].lower()
+        ]
+        self.assertEqual(scanned, [])
+
+
+class StorefrontQueryBudgetTests(QueryBudgetTestCase):
+    fixture_sizes = (1, 12)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.category = Category.objects.create(name="Budget")
+        cls.volumes = [Volume.objects.create(ml=ml) for ml in (30, 50)]
+
+    def grow_products(self, size):
+        while Product.objects.count() < size:
+            self.make_product(
+                self.category,
+                [
+                    (volume, 10 * n, 15 * n)
+                    for n, volume in enumerate(self.volumes, start=1)
+                ],
+            )
+
+    def test_index(self):
+        self.check_budget("users-home", 9, self.grow_products)
+
+    def test_index_prices(self):
+        self.grow_products(1)
+        response = self.client.get(reverse("users-home"))
+        self.assertContains(response, "UgX 15.00 - UgX 30.00")
+        self.assertNotContains(response, "No image available")
+
+    def test_anonymous_storefront_served_from_cache(self):
+        self.grow_products(1)
+        self.client.logout()
+        self.client.get(reverse("users-home"))
+        with self.assertNumQueries(0):
+            self.client.get(reverse("users-home"))
+
+        # Editing the catalog bumps its version once the edit commits
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.update(name="Renamed")
+            Product.objects.first().save()
+        self.assertContains(self.client.get(reverse("users-home")), "Renamed")
+
+    def test_anonymous_page_key_ignores_unknown_parameters(self):
+        self.grow_products(1)
+        self.client.logout()
+        self.client.get(reverse("users-home"), {"min_price": "10"})
+        for params in (
+            {"min_price": "10", "utm_source": "mail"},
+            {"min_price": "10.00", "max_price": "", "page": "1"},
+        ):
+            with self.assertNumQueries(0):
+                self.client.get(reverse("users-home"), params)
+
+    def test_price_filter_lists_each_product_once(self):
+        self.grow_products(13)
+        # Both volumes of every product fall in the range
+        response = self.client.get(
+            reverse("users-home"), {"min_price": 10, "max_price": 40}
+        )
+        self.assertContains(response, 'data-bs-ride="carousel"', count=12)
+        self.assertContains(response, "Page 1 of 2.")
+
+        response = self.client.get(reverse("users-home"), {"min_price": 20})
+        self.assertContains(response, "Page 1 of 2.")
+        self.assertNotContains(response, "Price not available")
+
+
+# =================================== Notifications ===================================
+class NotificationsApiTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        customer = Customer.objects.create(first_name="Ann", last_name="Buyer")
+        for status in ("Pending", "Shipped", "Delivered"):
+            Order.objects.create(
+                customer=customer, total_amount=Decimal(100), status=status
+            )
+        product = Product.objects.create(
+            name="Scarce", description="Low stock", status="ACTIVE"
+        )
+        Inventory.objects.create(product=product, quantity=2)
+        Contact.objects.create(name="Alice", email="alice@example.com", message="Hi")
+
+    def test_counts_and_items(self):
+        data = self.client.get(reverse("notifications-api")).json()
+        self.assertEqual(data["orders"]["count"], 2)
+        self.assertEqual(
+            [item["status"] for item in data["orders"]["items"]],
+            ["Shipped", "Pending"],
+        )
+        self.assertEqual(data["low_stock"]["items"][0]["name"], "Scarce")
+        self.assertEqual(data["feedback"]["count"], 1)
+
+    def test_unchanged_poll_is_not_modified(self):
+        etag = self.client.get(reverse("notifications-api"))["ETag"]
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(
+                reverse("notifications-api"), HTTP_IF_NONE_MATCH=etag
+            )
+        self.assertEqual(response.status_code, 304)
+        counted = [
+            query["sql"]
+            for query in captured.captured_queries
+            if "COUNT" in query["sql"]
+        ]
+        self.assertEqual(counted, [])
+
+    def test_writes_change_the_etag(self):
+        etag = self.client.get(reverse("notifications-api"))["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Contact.objects.create(name="Bob", email="bob@example.com", message="Hi")
+        response = self.client.get(
+            reverse("notifications-api"), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["feedback"]["count"], 2)
+        self.assertEqual(response.json()["feedback"]["items"][0]["name"], "Bob")
+
+
+# =================================== Images ===================================
+class CloudinaryImageStorageTests(SimpleTestCase):
+    def test_thumbnail_url_matches_the_eager_derivative(self):
+        url = "https://res.cloudinary.com/demo/image/upload/v1/product_images/p.jpg"
+        expected, _ = cloudinary_url(
+            "product_images/p.jpg",
+            version="1",
+            secure=True,
+            cloud_name="demo",
+            **CloudinaryImageStorage._transformation(300),
+        )
+        self.assertEqual(CloudinaryImageStorage().thumbnail_url(url, 300), expected)
+
+
+# =================================== Database cache budgets ===================================
+@override_settings(CACHES=DATABASE_CACHES)
+class DatabaseCacheQueryBudgetTests(QueryBudgetTestCase):
+    """
+    The budgets above assume Redis or LocMem. Without REDIS_URL production
+    falls back to the DatabaseCache, where every cache read and write is a
+    query too; these budgets cover that setup.
+    """
+
+    fixture_sizes = (2, 10)
+
+    def test_dashboard(self):
+        # Cold: each cached metric is read, computed and written back
+        self.check_budget("dashboard", 56, self.grow_sales)
+
+    def test_dashboard_refresh(self):
+        self.grow_sales(10)
+        self.client.get(reverse("dashboard"))
+        # Warm: one read per cached metric and metric version
+        with self.assertNumQueries(11):
+            self.client.get(reverse("dashboard"))
+
+    def test_sales_report(self):
+        today = date.today()
+        period = {
+            "start_date": (today - timedelta(days=30)).isoformat(),
+            "end_date": today.isoformat(),
+        }
+        self.check_budget("sales:sales_report", 15, self.grow_sales, params=period)
+
+
+# =================================== List search ===================================
+class SearchFilterTests(TestCase):
+    def test_blank_query_filters_nothing(self):
+        self.assertEqual(build_search_filter("   "), Q())
+
+    def test_number_matches_the_id_exactly(self):
+        self.assertEqual(build_search_filter("42"), Q(pk=42))
+        self.assertEqual(build_search_filter(" #42 "), Q(pk=42))
+        self.assertEqual(
+            build_search_filter("42", receipt_field="receipt_number"),
+            Q(pk=42) | Q(receipt_number="42"),
+        )
+
+    def test_number_beyond_the_id_range_matches_no_id(self):
+        self.assertEqual(build_search_filter(str(2**63)), Q(pk__in=[]))
+
+    def test_receipt_number_matches_exactly(self):
+        self.assertEqual(
+            build_search_filter("kla-20240101-000123", receipt_field="receipt_number"),
+            Q(receipt_number="KLA-20240101-000123"),
+        )
+        # Without a receipt field the token is searched as a name
+        self.assertEqual(
+            build_search_filter("kla-20240101-000123"),
+            Q(customer__first_name__istartswith="kla-20240101-000123")
+            | Q(customer__last_name__istartswith="kla-20240101-000123"),
+        )
+
+    def test_names_use_prefix_match_outside_postgresql(self):
+        self.assertEqual(
+            build_search_filter("Ann"),
+            Q(customer__first_name__istartswith="Ann")
+            | Q(customer__last_name__istartswith="Ann"),
+        )
+        self.assertEqual(
+            build_search_filter("Ann van Buyer"),
+            Q(
+                customer__first_name__istartswith="Ann",
+                customer__last_name__istartswith="van Buyer",
+            ),
+        )
+
+    def test_names_use_trigram_match_on_postgresql(self):
+        with mock.patch("apps.main.search.connection", mock.Mock(vendor="postgresql")):
+            self.assertEqual(
+                build_search_filter("nn", customer_field="order__customer"),
+                Q(order__customer__first_name__icontains="nn")
+                | Q(order__customer__last_name__icontains="nn"),
+            )
+
+    def test_prefix_fallback_against_the_database(self):
+        for first_name, last_name in (
+            ("Annabel", "Smith"),
+            ("Joanna", "Brown"),
+            ("Bob", "Annan"),
+        ):
+            Sale.objects.create(
+                customer=Customer.objects.create(
+                    first_name=first_name, last_name=last_name
+                ),
+                trans_date=date(2026, 10, 18),
+                receipt_number=f"KLA-20261018-{len(first_name):06d}",
+            )
+
+        def customers(query):
+            return sorted(
+                Sale.objects.filter(
+                    build_search_filter(query, receipt_field="receipt_number")
+                ).values_list("customer__first_name", flat=True)
+            )
+
+        self.assertEqual(customers("ann"), ["Annabel", "Bob"])
+        self.assertEqual(customers("annabel sm"), ["Annabel"])
+        self.assertEqual(customers("kla-20261018-000003"), ["Bob"])
+        self.assertEqual(
+            customers(f"#{Sale.objects.get(customer__first_name='Joanna').pk}"),
+            ["Joanna"],
+        )
+
+
+# =================================== Dashboard KPIs ===================================
+class SalesKpiTests(TestCase):
+    def add_days(self, totals):
+        DailySalesSummary.objects.bulk_create(
+            DailySalesSummary(date=day, gross_total=gross_total)
+            for day, gross_total in totals.items()
+        )
+
+    def test_monthly_series_and_period_totals(self):
+        self.add_days(
+            {
+                date(2025, 10, 18): 999,  # Last year
+                date(2026, 3, 5): 200,
+                date(2026, 10, 1): 50,
+                date(2026, 10, 12): 20,  # Monday of this week
+                date(2026, 10, 18): 5,
+            }
+        )
+
+        kpis = get_sales_kpis(today=date(2026, 10, 18))
+
+        monthly = [0.0] * 12
+        monthly[2], monthly[9] = 200, 75
+        self.assertEqual(kpis["monthly"], monthly)
+        self.assertEqual(
+            (kpis["year"], kpis["today"], kpis["week"], kpis["month"]),
+            (275, 5, 25, 75),
+        )
+
+    def test_week_starting_in_the_previous_year(self):
+        self.add_days(
+            {
+                date(2026, 12, 20): 100,  # Before the week
+                date(2026, 12, 29): 40,
+                date(2027, 1, 1): 25,
+                date(2027, 1, 2): 10,
+                date(2027, 1, 3): 1000,  # After today
+            }
+        )
+
+        # A Saturday, in a week that starts on Monday 2026-12-28
+        kpis = get_sales_kpis(today=date(2027, 1, 2))
+
+        self.assertEqual(kpis["monthly"], [35] + [0.0] * 11)
+        self.assertEqual(
+            (kpis["year"], kpis["today"], kpis["week"], kpis["month"]),
+            (35, 10, 75, 35),
+        )
@@ -13,4 +13,10 @@ urlpatterns = [
         name="monthly_earnings_view",
     ),
     path("dashboard/sales-data/", views.sales_data_api, name="sales-data-api"),
+    # Navbar notifications
+    path(
+        "dashboard/notifications/",
+        views.notifications_api,
+        name="notifications-api",
+    ),
 ]
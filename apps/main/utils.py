@@ -1,13 +1,86 @@
-from django.db.models import Sum, F
-from apps.products.models import Product
+from datetime import date, timedelta
 
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, ExtractYear
+from apps.products.models import Category, Product
+from apps.sales.models import DailySalesSummary, ProductSalesCounter
+from apps.sales.rollups import period_starts
 
-def get_top_selling_products():
-    return (
-        Product.objects.annotate(
-            total_quantity_sold=Sum("saledetail__quantity"),
-            total_sales_value=Sum(F("saledetail__total_detail")),
+
+def get_top_selling_products(period="all", limit=6, today=None):
+    """
+    Best sellers of the current ``period`` ("all", "year", "month" or
+    "week"), read from the maintained counters through their index.
+    """
+    period_start = dict(period_starts(today or date.today()))[period]
+    return list(
+        ProductSalesCounter.objects.filter(
+            period=period, period_start=period_start, items__gt=0
         )
-        .filter(total_quantity_sold__gt=0)  # Only include products that have been sold
-        .order_by("-total_quantity_sold")[:6]
+        .order_by("-items")
+        .values(
+            "product_id",
+            name=F("product__name"),
+            total_quantity_sold=F("items"),
+            total_sales_value=F("revenue"),
+        )[:limit]
+    )
+
+
+# =================================== Dashboard KPIs ===================================
+def get_sales_kpis(today=None):
+    """
+    Gross sales for every month of the current year plus today, this week
+    and this month, read from the daily rollups in one conditional aggregate.
+    """
+    today = today or date.today()
+    year_start = today.replace(month=1, day=1)
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+
+    def total(condition):
+        return Sum("gross_total", filter=condition)
+
+    aggregates = {
+        f"month_{month}": total(Q(date__year=today.year, date__month=month))
+        for month in range(1, 13)
+    }
+    aggregates.update(
+        today=total(Q(date=today)),
+        week=total(Q(date__gte=week_start)),
+        month=total(Q(date__gte=month_start)),
+    )
+    # The week can start in December of the previous year
+    totals = DailySalesSummary.objects.filter(
+        date__range=[min(year_start, week_start), today]
+    ).aggregate(**aggregates)
+
+    monthly = [totals[f"month_{month}"] or 0.0 for month in range(1, 13)]
+    return {
+        "monthly": monthly,
+        "year": sum(monthly),
+        "today": totals["today"] or 0.0,
+        "week": totals["week"] or 0.0,
+        "month": totals["month"] or 0.0,
+    }
+
+
+def get_yearly_sales():
+    """``(year, gross sales)`` pairs for every year with sales."""
+    return list(
+        DailySalesSummary.objects.annotate(year=ExtractYear("date"))
+        .values("year")
+        .annotate(total_sales=Sum("gross_total"))
+        .order_by("year")
+        .values_list("year", "total_sales")
+    )
+
+
+def get_catalog_counts():
+    """Active product count and their total stock, plus the category count."""
+    counts = Product.objects.aggregate(
+        products=Count("id", filter=Q(status="ACTIVE")),
+        total_stock=Coalesce(Sum("inventory__quantity", filter=Q(status="ACTIVE")), 0),
     )
+    counts["categories"] = Category.objects.count()
+    return counts
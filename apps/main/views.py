@@ -1,156 +1,177 @@
+import hashlib
 import json
-from django.http import JsonResponse
-from datetime import date, timedelta
-from django.db.models.functions import ExtractYear
+from datetime import date
+from decimal import Decimal
+from django.http import HttpResponse, JsonResponse, QueryDict
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum, FloatField, F
-from django.db.models.functions import Coalesce
+from django.contrib.messages import get_messages
 from django.shortcuts import render
-from django.db.models import Min, Max
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
-from apps.products.models import Product, Category
+from apps.customers.models import Customer
+from apps.products.cards import filter_cards_by_price
+from apps.products.models import ProductCard
 from .forms import ProductFilterForm
-from apps.sales.models import Sale
-from apps.orders.models import Cart, CartItem, Order, Wishlist
+from .metrics import CATALOG, SALES, cached_metric
+from .notifications import get_notifications, get_notifications_etag
+from apps.sales.analytics import get_sales_history_analytics
+from apps.sales.models import TOP_SELLER_PERIOD_CHOICES
+from apps.orders.models import CartItem, Order, Wishlist
 
 from apps.authentication.decorators import (
     admin_or_manager_or_staff_required,
 )
 
 from .utils import (
+    get_catalog_counts,
+    get_sales_kpis,
     get_top_selling_products,
+    get_yearly_sales,
 )
 
 
 # =================================== Home User view  ===================================
-def index(request):
-    # Initialize the filter form
-    form = ProductFilterForm(request.GET)
+def get_storefront_badges(user):
+    """Wishlist, cart and order counts shown above the storefront grid."""
+    if not user.is_authenticated:
+        return {"cart_count": 0, "wishlist_count": 0, "order_count": 0}
+
+    # Order is linked to the Customer, not to the user directly
+    customer = Customer.objects.filter(user=user).first()
+    return {
+        "cart_count": CartItem.objects.filter(cart__user=user).aggregate(
+            total=Coalesce(Sum("quantity"), 0)
+        )["total"],
+        "wishlist_count": Wishlist.objects.filter(user=user).count(),
+        "order_count": (
+            Order.objects.filter(customer=customer).count() if customer else 0
+        ),
+    }
 
-    # Start with all active products
-    products = Product.objects.prefetch_related("images", "productvolume_set").filter(
-        status="ACTIVE"
-    )
 
-    # Initialize counts for cart, wishlist, and orders
-    cart_count = 0
-    wishlist_count = 0
-    order_count = 0
-
-    # Fetch the user's cart and calculate the cart count only if the user is authenticated
-    if request.user.is_authenticated:
-        # Ensure the user is a Customer instance (if needed)
-        customer = None
-        if hasattr(request.user, "customer"):
-            customer = (
-                request.user.customer
-            )  # Assuming a one-to-one relationship between User and Customer
-
-        # Get or create the user's cart
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        cart_items = CartItem.objects.filter(cart=cart)
-        cart_count = sum(item.quantity for item in cart_items)
-
-        # Fetch the user's wishlist count
-        wishlist_count = Wishlist.objects.filter(user=request.user).count()
-
-        # Fetch the user's order count
-        # If Order model expects a Customer instance, ensure we're using the Customer instance
-        if customer:
-            order_count = Order.objects.filter(customer=customer).count()
-        else:
-            order_count = 0  # If there's no customer instance, handle accordingly
-
-    # Apply filters if the form is valid
-    if form.is_valid():
-        category_filter = form.cleaned_data.get("category")
-        min_price = form.cleaned_data.get("min_price")
-        max_price = form.cleaned_data.get("max_price")
-        search_query = form.cleaned_data.get("search")
-
-        # Filter by category if selected
-        if category_filter:
-            products = products.filter(category=category_filter)
-
-        # Filter by price range if provided
-        if min_price is not None and max_price is not None:
-            products = products.filter(
-                productvolume__price__gte=min_price, productvolume__price__lte=max_price
-            )
-        elif min_price is not None:
-            products = products.filter(productvolume__price__gte=min_price)
-        elif max_price is not None:
-            products = products.filter(productvolume__price__lte=max_price)
-
-        # Filter by search query if provided
-        if search_query:
-            products = products.filter(name__icontains=search_query)
+def render_product_grid(filters, page_number):
+    """Render the product cards and pagination for the given storefront filters."""
+    # Active products read from the denormalized card table
+    products = ProductCard.objects.filter(status="ACTIVE").order_by("product_id")
+
+    category_filter = filters.get("category")
+    min_price = filters.get("min_price")
+    max_price = filters.get("max_price")
+    search_query = filters.get("search")
+
+    # Filter by category if selected
+    if category_filter:
+        products = products.filter(category=category_filter)
+
+    # Filter by price range if provided
+    products = filter_cards_by_price(products, min_price, max_price)
+
+    # Filter by search query if provided
+    if search_query:
+        products = products.filter(name__icontains=search_query)
 
     # Pagination setup
     paginator = Paginator(products, 12)  # Show 12 products per page
-    page_number = request.GET.get("page", 1)
+    try:
+        page_obj = paginator.page(page_number)
+    except EmptyPage:
+        page_obj = paginator.page(paginator.num_pages)
+
+    return render_to_string(
+        "main/_product_grid.html", {"cards": page_obj, "page_obj": page_obj}
+    )
+
 
+def _storefront_key(*parts):
+    return hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def _storefront_query(params):
+    """
+    ``params`` reduced to the filters ProductFilterForm accepts, cleaned, plus
+    the page number. Unknown or invalid parameters are dropped, so they cannot
+    each add a cache entry for what is the same page.
+    """
+    query = QueryDict(mutable=True)
+    form = ProductFilterForm(params)
+    if form.is_valid():
+        for name, value in form.cleaned_data.items():
+            if value is None or value == "":
+                continue
+            if name == "category":
+                value = value.pk
+            elif isinstance(value, Decimal):
+                # "10", "10.0" and "10.00" are the same price
+                value = f"{value:.2f}"
+            query[name] = value
     try:
-        page_number = int(page_number)
-        if page_number < 1:
-            page_number = 1
+        page_number = int(params.get("page", 1))
     except ValueError:
         page_number = 1
+    if page_number > 1:
+        query["page"] = page_number
+    return query
+
+
+def _render_index(request, params):
+    # Initialize the filter form
+    form = ProductFilterForm(params)
+    filters = form.cleaned_data if form.is_valid() else {}
 
     try:
-        page_obj = paginator.page(page_number)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
+        page_number = max(int(params.get("page", 1)), 1)
+    except ValueError:
+        page_number = 1
 
-    # Prepare the products with images and volumes
-    products_with_images = []
-    for product in page_obj:
-        images = product.images.filter(is_default=True)
-        if not images.exists():
-            images = product.images.all()
-
-        volumes = product.productvolume_set.all()
-        if volumes.exists():
-            min_vol_price = volumes.aggregate(Min("price"))["price__min"]
-            max_vol_price = volumes.aggregate(Max("price"))["price__max"]
-        else:
-            min_vol_price = max_vol_price = None
-
-        products_with_images.append(
-            {
-                "product": product,
-                "images": images,
-                "min_price": min_vol_price,
-                "max_price": max_vol_price,
-            }
-        )
+    # The grid is shared by every user until the catalog changes
+    category = filters.get("category")
+    key = _storefront_key(
+        category.pk if category else None,
+        filters.get("min_price"),
+        filters.get("max_price"),
+        filters.get("search"),
+        page_number,
+    )
+    product_grid = cached_metric(
+        f"storefront-grid:{key}",
+        lambda: render_product_grid(filters, page_number),
+        [CATALOG],
+    )
 
-    # Pass the form, filtered products, and pagination to the template
+    # Pass the form, the rendered grid and the user's badges to the template
     return render(
         request,
         "index.html",
         {
             "form": form,
-            "products_with_images": products_with_images,
+            "product_grid": mark_safe(product_grid),
             "user": request.user,
-            "page_obj": page_obj,
-            "cart_count": cart_count,
-            "wishlist_count": wishlist_count,
-            "order_count": order_count,
+            **get_storefront_badges(request.user),
         },
     )
 
 
-@login_required
-@admin_or_manager_or_staff_required
-def get_total_sales_for_period(start_date, end_date):
-    return (
-        Sale.objects.filter(trans_date__range=[start_date, end_date]).aggregate(
-            total_sales=Sum("grand_total")
-        )["total_sales"]
-        or 0
-    )
+def index(request):
+    # Anonymous visitors all see the same page, so it is cached whole unless
+    # a flash message has to be shown
+    if not request.user.is_authenticated and not len(get_messages(request)):
+        # Rendered from the cleaned filters, so the page matches its key
+        query = _storefront_query(request.GET)
+        key = _storefront_key(sorted(query.lists()))
+        content = cached_metric(
+            f"storefront-page:{key}",
+            lambda: _render_index(request, query).content,
+            [CATALOG],
+        )
+        return HttpResponse(content)
+
+    return _render_index(request, request.GET)
 
 
 # =================================== The dashboard view ===================================from django.db.models import Sum
@@ -159,54 +180,33 @@ def get_total_sales_for_period(start_date, end_date):
 @login_required
 @admin_or_manager_or_staff_required
 def dashboard(request):
+    # Served from the shared cache until a sale or catalog write bumps it
     today = date.today()
-    year = today.year
-
-    # Helper function to get total sales for a period
-    def get_total_sales_for_period(start_date, end_date):
-        return (
-            Sale.objects.filter(trans_date__range=[start_date, end_date]).aggregate(
-                total_sales=Coalesce(Sum("grand_total"), 0.0)
-            )["total_sales"]
-            or 0
-        )
-
-    # Calculate monthly and annual earnings
-    monthly_earnings = [
-        Sale.objects.filter(trans_date__year=year, trans_date__month=month).aggregate(
-            total=Coalesce(Sum("grand_total"), 0.0)
-        )["total"]
-        for month in range(1, 13)
-    ]
-    annual_earnings = format(sum(monthly_earnings), ".2f")
-    avg_month = format(sum(monthly_earnings) / 12, ".2f")
-
-    # Get total sales for today, week, and month
-    total_sales_today = get_total_sales_for_period(today, today)
-    total_sales_week = get_total_sales_for_period(
-        today - timedelta(days=today.weekday()), today
+    kpis = cached_metric(f"sales-kpis:{today}", lambda: get_sales_kpis(today), [SALES])
+    catalog = cached_metric("catalog-counts", get_catalog_counts, [CATALOG])
+    top_period = request.GET.get("top", "all")
+    if top_period not in dict(TOP_SELLER_PERIOD_CHOICES):
+        top_period = "all"
+    top_products = cached_metric(
+        f"top-products:{today}:{top_period}",
+        lambda: get_top_selling_products(top_period, today=today),
+        [SALES, CATALOG],
     )
-    total_sales_month = get_total_sales_for_period(today.replace(day=1), today)
-
-    # Get top-selling products using the new method
-    top_products = get_top_selling_products()
-
-    # Total stock from Inventory
-    total_stock = Product.objects.filter(status="ACTIVE").aggregate(
-        total=Coalesce(Sum("inventory__quantity"), 0)
-    )["total"]
 
     context = {
-        "products": Product.objects.filter(status="ACTIVE").count(),
-        "total_stock": total_stock,
-        "categories": Category.objects.count(),
-        "annual_earnings": annual_earnings,
-        "monthly_earnings": json.dumps(monthly_earnings),
-        "avg_month": avg_month,
-        "total_sales_today": total_sales_today,
-        "total_sales_week": total_sales_week,
-        "total_sales_month": total_sales_month,
+        "products": catalog["products"],
+        "total_stock": catalog["total_stock"],
+        "categories": catalog["categories"],
+        "annual_earnings": format(kpis["year"], ".2f"),
+        "monthly_earnings": json.dumps(kpis["monthly"]),
+        "avg_month": format(kpis["year"] / 12, ".2f"),
+        "total_sales_today": kpis["today"],
+        "total_sales_week": kpis["week"],
+        "total_sales_month": kpis["month"],
         "top_products": top_products,
+        "top_period": top_period,
+        "top_periods": TOP_SELLER_PERIOD_CHOICES,
+        "analytics": get_sales_history_analytics()["summary"],
     }
 
     return render(request, "main/dashboard.html", context)
@@ -216,20 +216,9 @@ def dashboard(request):
 @admin_or_manager_or_staff_required
 def monthly_earnings_view(request):
     today = date.today()
-    year = today.year
-    monthly_earnings = []
-
-    for month in range(1, 13):
-        earning = (
-            Sale.objects.filter(trans_date__year=year, trans_date__month=month)
-            .aggregate(
-                total_variable=Coalesce(
-                    Sum(F("grand_total")), 0.0, output_field=FloatField()
-                )
-            )
-            .get("total_variable")
-        )
-        monthly_earnings.append(earning)
+    monthly_earnings = cached_metric(
+        f"sales-kpis:{today}", lambda: get_sales_kpis(today), [SALES]
+    )["monthly"]
 
     return JsonResponse(
         {
@@ -256,19 +245,23 @@ def monthly_earnings_view(request):
 @login_required
 @admin_or_manager_or_staff_required
 def sales_data_api(request):
-    # Query to get total sales grouped by year
-    sales_per_year = (
-        Sale.objects.annotate(year=ExtractYear("trans_date"))
-        .values("year")
-        .annotate(total_sales=Sum("grand_total"))
-        .order_by("year")
-    )
+    sales_per_year = cached_metric("yearly-sales", get_yearly_sales, [SALES])
 
     # Prepare the data as a dictionary
     data = {
-        "years": [item["year"] for item in sales_per_year],
-        "total_sales": [item["total_sales"] for item in sales_per_year],
+        "years": [year for year, _ in sales_per_year],
+        "total_sales": [total for _, total in sales_per_year],
     }
 
     # Return the data as JSON
     return JsonResponse(data)
+
+
+# =================================== Staff notifications ===================================
+@login_required
+@admin_or_manager_or_staff_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=lambda request: get_notifications_etag())
+def notifications_api(request):
+    # Polled by the navbar; unchanged counters are answered with a 304
+    return JsonResponse(get_notifications())
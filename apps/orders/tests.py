@@ -1 +1,51 @@
-# Create your tests here.
+from decimal import Decimal
+
+from apps.customers.models import Customer
+from apps.main.testing import QueryBudgetTestCase
+from apps.products.models import Category, Volume
+
+from .models import Cart, CartItem, Order, Wishlist
+
+
+# =================================== Query budgets ===================================
+class OrderQueryBudgetTests(QueryBudgetTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.category = Category.objects.create(name="Budget")
+        cls.volume = Volume.objects.create(ml=50)
+        cls.customer = Customer.objects.create(first_name="Budget", last_name="Buyer")
+
+    def grow_wishlist(self, size):
+        while Wishlist.objects.filter(user=self.user).count() < size:
+            product, _ = self.make_product(self.category, [(self.volume, 10, 15)])
+            Wishlist.objects.create(user=self.user, product=product)
+
+    def grow_cart(self, size):
+        cart, _ = Cart.objects.get_or_create(user=self.user)
+        while cart.items.count() < size:
+            product, (volume,) = self.make_product(
+                self.category, [(self.volume, 10, 15)]
+            )
+            CartItem.objects.create(cart=cart, product=product, volume=volume)
+
+    def grow_orders(self, size):
+        while Order.objects.count() < size:
+            customer = Customer.objects.create(
+                first_name="Order", last_name=f"Customer {Order.objects.count()}"
+            )
+            Order.objects.create(
+                customer=customer, total_amount=Decimal(100), status="Pending"
+            )
+
+    def test_wishlist(self):
+        self.check_budget("orders:wishlist", 5, self.grow_wishlist)
+
+    def test_cart(self):
+        self.check_budget("orders:cart", 5, self.grow_cart)
+
+    def test_orders_to_be_processed(self):
+        self.check_budget("orders:orders_to_be_processed", 6, self.grow_orders)
+
+    def test_all_orders(self):
+        self.check_budget("orders:all_orders", 6, self.grow_orders)
@@ -2,7 +2,6 @@ from django.core.mail import EmailMultiAlternatives
 from django.core.mail import send_mail
 from django.utils.html import strip_tags
 from django.core.paginator import Paginator
-from django.db.models import Q
 from django.conf import settings
 from django.contrib import messages
 import requests
@@ -17,10 +16,11 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from django.db import transaction
 from .models import Cart, CartItem, Order, OrderDetail, Wishlist
-from apps.products.models import Product, ProductVolume, ProductImage
+from apps.products.models import Product, ProductVolume
 from django.core.exceptions import MultipleObjectsReturned
 from .forms import CheckoutForm, OrderStatusForm
 from apps.customers.models import Customer
+from apps.main.search import build_search_filter
 
 from apps.authentication.decorators import (
     admin_required,
@@ -84,8 +84,12 @@ def wishlist_add(request, product_id):
 # =================================== wishlist_view ===================================
 @login_required
 def wishlist_view(request):
-    # Fetch all the products in the user's wishlist
-    wishlist_items = Wishlist.objects.filter(user=request.user)
+    # Fetch all the products in the user's wishlist with their product cards
+    wishlist_items = (
+        Wishlist.objects.filter(user=request.user)
+        .select_related("product__card")
+        .order_by("id")
+    )
 
     # Paginate the wishlist items (10 items per page)
     paginator = Paginator(wishlist_items, 12)  # Show 10 wishlist items per page
@@ -94,11 +98,10 @@ def wishlist_view(request):
     )  # Get the current page number from the request
     page_obj = paginator.get_page(page_number)  # Get the page object
 
-    # Fetch the default image for each product in the wishlist
+    # Take the image from the card, when the product has one
     for item in page_obj:
-        item.default_image = ProductImage.objects.filter(
-            product=item.product, is_default=True
-        ).first()
+        card = getattr(item.product, "card", None)
+        item.default_image_url = card.image_url if card else None
 
     # Pass the page object to the template
     context = {"page_obj": page_obj}
@@ -181,11 +184,13 @@ def add_to_cart(request, product_id):
 @login_required
 def cart_view(request):
     cart, created = Cart.objects.get_or_create(user=request.user)
+    cart_items = list(cart.items.select_related("product", "volume__volume"))
 
-    total_price = sum(item.get_total_price() for item in cart.items.all())
+    total_price = sum(item.get_total_price() for item in cart_items)
 
     context = {
         "cart": cart,
+        "cart_items": cart_items,
         "total_price": total_price,
     }
 
@@ -498,17 +503,15 @@ def order_confirmation_view(request, order_id):
 @admin_or_manager_or_staff_required
 def orders_to_be_processed_view(request):
     search_query = request.GET.get("search", "")
-    orders = Order.objects.filter(status__in=["Pending", "Shipped"]).order_by(
-        "created_at"
+    orders = (
+        Order.objects.filter(status__in=["Pending", "Shipped"])
+        .select_related("customer")
+        .order_by("created_at")
     )
 
     # Apply search filter if search query is provided
     if search_query:
-        orders = orders.filter(
-            Q(customer__first_name__icontains=search_query)
-            | Q(customer__last_name__icontains=search_query)
-            | Q(id__icontains=search_query)
-        )
+        orders = orders.filter(build_search_filter(search_query))
 
     # Pagination
     paginator = Paginator(orders, 25)  # Show 25 orders per page
@@ -572,16 +575,12 @@ def all_orders_view(request):
 
     # Filter orders based on status and search term
     if status_filter == "All" or status_filter == "":
-        orders = Order.objects.all()
+        orders = Order.objects.select_related("customer")
     else:
-        orders = Order.objects.filter(status=status_filter)
+        orders = Order.objects.select_related("customer").filter(status=status_filter)
 
     if search_query:
-        orders = orders.filter(
-            Q(customer__first_name__icontains=search_query)
-            | Q(customer__last_name__icontains=search_query)
-            | Q(id__icontains=search_query)
-        )
+        orders = orders.filter(build_search_filter(search_query))
 
     # Paginate orders (25 orders per page)
     paginator = Paginator(orders, 25)
@@ -0,0 +1,143 @@
+import logging
+
+from django.db import transaction
+from django.db.models import Exists, Max, Min, OuterRef, Prefetch, Subquery
+
+from apps.inventory.models import Inventory
+from apps.main.images import thumbnail_url
+from .models import Product, ProductCard, ProductImage, ProductVolume
+
+logger = logging.getLogger(__name__)
+
+REBUILD_CHUNK_SIZE = 1000
+# Every card column rewritten when a card already exists
+CARD_FIELDS = [
+    "status",
+    "name",
+    "category",
+    "category_name",
+    "gender",
+    "min_price",
+    "max_price",
+    "image_urls",
+    "quantity",
+    "updated_at",
+]
+# Thumbnail shown on catalog cards, which are at most 200px tall
+CARD_IMAGE_SIZE = 300
+
+
+# =================================== Card building ===================================
+def _image_urls(images):
+    defaults = [image for image in images if image.is_default]
+    return [
+        thumbnail_url(image.image.url, CARD_IMAGE_SIZE)
+        for image in defaults or images
+        if image.image
+    ]
+
+
+def build_cards(products):
+    """Unsaved ProductCard rows for ``products`` with three queries in total."""
+    products = (
+        products.select_related("category", "inventory")
+        .annotate(
+            card_min_price=Min("productvolume__price"),
+            card_max_price=Max("productvolume__price"),
+        )
+        .prefetch_related(
+            Prefetch(
+                "images", queryset=ProductImage.objects.all(), to_attr="card_images"
+            )
+        )
+        .order_by("id")
+    )
+    return [
+        ProductCard(
+            product=product,
+            status=product.status,
+            name=product.name,
+            category=product.category,
+            category_name=product.category.name if product.category else "",
+            gender=product.gender or "",
+            min_price=product.card_min_price,
+            max_price=product.card_max_price,
+            image_urls=_image_urls(product.card_images),
+            quantity=(
+                product.inventory.quantity if hasattr(product, "inventory") else 0
+            ),
+        )
+        for product in products
+    ]
+
+
+# =================================== Listing filters ===================================
+def filter_cards_by_price(cards, min_price=None, max_price=None):
+    """
+    Keep the cards with at least one volume priced within the range. The
+    ``Exists`` subquery returns each product once, so counts and pages stay
+    correct, and is served by the (price, product) volume index.
+    """
+    if min_price is None and max_price is None:
+        return cards
+    volumes = ProductVolume.objects.filter(product_id=OuterRef("product_id"))
+    if min_price is not None:
+        volumes = volumes.filter(price__gte=min_price)
+    if max_price is not None:
+        volumes = volumes.filter(price__lte=max_price)
+    return cards.filter(Exists(volumes))
+
+
+# =================================== Synchronisation ===================================
+def save_cards(cards):
+    """
+    Insert ``cards`` or overwrite the existing rows in a single upsert, so
+    two refreshes of the same product never collide on its primary key.
+    """
+    ProductCard.objects.bulk_create(
+        cards,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=CARD_FIELDS,
+    )
+
+
+def refresh_cards(product_ids):
+    """Rewrite the cards of ``product_ids``, dropping those of deleted products."""
+    product_ids = set(product_ids)
+    with transaction.atomic():
+        cards = build_cards(Product.objects.filter(id__in=product_ids))
+        save_cards(cards)
+        ProductCard.objects.filter(product_id__in=product_ids).exclude(
+            product_id__in=[card.product_id for card in cards]
+        ).delete()
+    logger.info(f"Refreshed {len(cards)} product card(s)")
+
+
+def schedule_card_refresh(product_ids):
+    """Refresh the cards of ``product_ids`` once the current transaction commits."""
+    product_ids = set(product_ids)
+    transaction.on_commit(lambda: refresh_cards(product_ids))
+
+
+def sync_card_stock(product_ids):
+    """Copy the inventory quantity of ``product_ids`` onto their cards."""
+    ProductCard.objects.filter(product_id__in=product_ids).update(
+        quantity=Subquery(
+            Inventory.objects.filter(product_id=OuterRef("product_id")).values(
+                "quantity"
+            )[:1]
+        )
+    )
+
+
+def rebuild_cards(chunk_size=REBUILD_CHUNK_SIZE, stdout=None):
+    """Rebuild every card from scratch, ``chunk_size`` products at a time."""
+    ProductCard.objects.all().delete()
+    product_ids = list(Product.objects.order_by("id").values_list("id", flat=True))
+    for start in range(0, len(product_ids), chunk_size):
+        chunk = product_ids[start : start + chunk_size]
+        save_cards(build_cards(Product.objects.filter(id__in=chunk)))
+        if stdout:
+            stdout.write(f"Rebuilt {start + len(chunk)} of {len(product_ids)} cards...")
+    return len(product_ids)
@@ -42,6 +42,8 @@ class VolumeForm(forms.ModelForm):
 # =================================== ProductVolumeForm form ===================================
 class ProductVolumeForm(forms.ModelForm):
     MAX_IMAGE_SIZE_MB = 10
+    # A plain file field: the model stores uploads in the background
+    image = forms.ImageField(required=False)
 
     class Meta:
         model = ProductVolume
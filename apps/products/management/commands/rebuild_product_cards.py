@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.products.cards import REBUILD_CHUNK_SIZE, rebuild_cards
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the denormalized product cards from the catalog. Run after "
+        "deploying the cards or any bulk edit of products, volumes or images."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=REBUILD_CHUNK_SIZE,
+            help=f"Products built per query (default: {REBUILD_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, **options):
+        # One transaction, so listings never see a half-built table
+        with transaction.atomic():
+            total = rebuild_cards(max(options["chunk_size"], 1), self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} product cards."))
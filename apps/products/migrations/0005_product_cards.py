@@ -0,0 +1,136 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:08
+
+from django.db import migrations, models
+from django.db.models import Max, Min
+import django.db.models.deletion
+
+
+def build_cards(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    ProductCard = apps.get_model("products", "ProductCard")
+    Inventory = apps.get_model("inventory", "Inventory")
+
+    stock = dict(Inventory.objects.values_list("product_id", "quantity"))
+    products = (
+        Product.objects.select_related("category")
+        .annotate(card_min_price=Min("productvolume__price"))
+        .annotate(card_max_price=Max("productvolume__price"))
+        .prefetch_related("images")
+    )
+    cards = []
+    for product in products.iterator(chunk_size=1000):
+        images = list(product.images.all())
+        defaults = [image for image in images if image.is_default]
+        cards.append(
+            ProductCard(
+                product=product,
+                status=product.status,
+                name=product.name,
+                category=product.category,
+                category_name=product.category.name if product.category else "",
+                gender=product.gender or "",
+                min_price=product.card_min_price,
+                max_price=product.card_max_price,
+                image_urls=[
+                    image.image.url for image in defaults or images if image.image
+                ],
+                quantity=stock.get(product.id, 0),
+            )
+        )
+    ProductCard.objects.bulk_create(cards, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0001_initial"),
+        ("products", "0004_alter_category_description"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductCard",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="card",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                ("status", models.CharField(max_length=10, verbose_name="Status")),
+                ("name", models.CharField(max_length=256, verbose_name="Product Name")),
+                (
+                    "category_name",
+                    models.CharField(
+                        blank=True, max_length=100, verbose_name="Category Name"
+                    ),
+                ),
+                (
+                    "gender",
+                    models.CharField(blank=True, max_length=10, verbose_name="Gender"),
+                ),
+                (
+                    "min_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        verbose_name="Lowest Price",
+                    ),
+                ),
+                (
+                    "max_price",
+                    models.DecimalField(
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        verbose_name="Highest Price",
+                    ),
+                ),
+                (
+                    "image_urls",
+                    models.JSONField(default=list, verbose_name="Image URLs"),
+                ),
+                (
+                    "quantity",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Stock Quantity"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Updated At"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to="products.category",
+                        verbose_name="Category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Product Card",
+                "verbose_name_plural": "Product Cards",
+                "db_table": "product_card",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "product"], name="product_card_status_idx"
+                    ),
+                    models.Index(
+                        fields=["status", "category", "product"],
+                        name="product_card_category_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(build_cards, migrations.RunPython.noop),
+    ]
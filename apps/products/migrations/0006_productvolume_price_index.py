@@ -0,0 +1,19 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0005_product_cards"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="productvolume",
+            index=models.Index(
+                fields=["price", "product"], name="productvolume_price_idx"
+            ),
+        ),
+    ]
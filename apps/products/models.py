@@ -4,7 +4,7 @@ from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
 from apps.supplier.models import Supplier
 from cloudinary.models import CloudinaryField
-import cloudinary.uploader
+from apps.main.images import schedule_image, take_upload
 
 # Define choices for product status
 STATUS_CHOICES = [
@@ -139,16 +139,18 @@ class ProductVolume(models.Model):
 
     class Meta:
         unique_together = ("product", "volume", "product_type")
+        indexes = [
+            models.Index(fields=["price", "product"], name="productvolume_price_idx")
+        ]
         verbose_name = "Product Volume"
         verbose_name_plural = "Product Volumes"
 
     def save(self, *args, **kwargs):
-        if self.image and not str(self.image).startswith("http"):
-            upload_result = cloudinary.uploader.upload(
-                self.image.file, folder="product_volume_images"
-            )
-            self.image = upload_result["url"]
+        # New uploads are stored in the background once the save commits
+        upload = take_upload(self, "image")
         super().save(*args, **kwargs)
+        if upload:
+            schedule_image(self, "image", upload, "product_volume_images")
 
     def __str__(self):
         return f"{self.product.name} - {self.volume.ml}ML (Cost: {self.cost}, Price: {self.price})"
@@ -188,16 +190,66 @@ class ProductImage(models.Model):
     def save(self, *args, **kwargs):
         # Ensure no other images are marked as default if this one is set as default
         if self.is_default:
-            ProductImage.objects.filter(product=self.product, is_default=True).update(
-                is_default=False
-            )
+            ProductImage.objects.filter(
+                product_id=self.product_id, is_default=True
+            ).exclude(pk=self.pk).update(is_default=False)
 
+        # New uploads are stored in the background once the save commits
+        upload = take_upload(self, "image")
         super().save(*args, **kwargs)
+        if upload:
+            schedule_image(self, "image", upload, "product_images")
 
-    def save(self, *args, **kwargs):
-        if self.image and not str(self.image).startswith("http"):
-            upload_result = cloudinary.uploader.upload(
-                self.image.file, folder="product_images"
-            )
-            self.image = upload_result["url"]
-        super().save(*args, **kwargs)
\ No newline at end of file
+
+class ProductCard(models.Model):
+    """
+    Flat, denormalized card data for one product, kept in sync by
+    ``apps.products.cards`` so catalog listings read a single table.
+    """
+
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name="card"
+    )
+    status = models.CharField(max_length=10, verbose_name="Status")
+    name = models.CharField(max_length=256, verbose_name="Product Name")
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+        verbose_name="Category",
+    )
+    category_name = models.CharField(
+        max_length=100, blank=True, verbose_name="Category Name"
+    )
+    gender = models.CharField(max_length=10, blank=True, verbose_name="Gender")
+    min_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, verbose_name="Lowest Price"
+    )
+    max_price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, verbose_name="Highest Price"
+    )
+    # Default image URLs, or every image URL when none is marked default
+    image_urls = models.JSONField(default=list, verbose_name="Image URLs")
+    quantity = models.PositiveIntegerField(default=0, verbose_name="Stock Quantity")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated At")
+
+    class Meta:
+        db_table = "product_card"
+        verbose_name = "Product Card"
+        verbose_name_plural = "Product Cards"
+        indexes = [
+            models.Index(fields=["status", "product"], name="product_card_status_idx"),
+            models.Index(
+                fields=["status", "category", "product"],
+                name="product_card_category_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Card for {self.name}"
+
+    @property
+    def image_url(self):
+        return self.image_urls[0] if self.image_urls else None
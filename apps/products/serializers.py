@@ -0,0 +1,26 @@
+from rest_framework import serializers
+
+from .models import ProductCard
+
+
+class ProductCardSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="product_id")
+    category = serializers.CharField(source="category_name")
+    # Public endpoint, so only whether the product can be ordered, not the count
+    in_stock = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProductCard
+        fields = (
+            "id",
+            "name",
+            "category",
+            "gender",
+            "min_price",
+            "max_price",
+            "image_urls",
+            "in_stock",
+        )
+
+    def get_in_stock(self, card):
+        return card.quantity > 0
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.inventory.models import Inventory
+from .cards import schedule_card_refresh
+from .models import Category, Product, ProductImage, ProductVolume
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_card(sender, instance, **kwargs):
+    schedule_card_refresh([instance.pk])
+
+
+@receiver(post_save, sender=ProductVolume)
+@receiver(post_delete, sender=ProductVolume)
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+@receiver(post_save, sender=Inventory)
+@receiver(post_delete, sender=Inventory)
+def refresh_related_card(sender, instance, origin=None, **kwargs):
+    # Rows removed together with their product take the card with them
+    if isinstance(origin, Product) or getattr(origin, "model", None) is Product:
+        return
+    schedule_card_refresh([instance.product_id])
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def refresh_category_cards(sender, instance, created=False, **kwargs):
+    # Collected before a delete detaches the products from the category
+    if not created:
+        schedule_card_refresh(
+            Product.objects.filter(category=instance).values_list("id", flat=True)
+        )
@@ -1 +1,179 @@
-# Create your tests here.
+import os
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from apps.inventory.models import Inventory
+from apps.main.images import LocalImageStorage
+from apps.main.testing import LocalImagesMixin
+from apps.sales.utils import _write_stock
+
+from .cards import rebuild_cards, refresh_cards
+from .models import (
+    Category,
+    Product,
+    ProductCard,
+    ProductImage,
+    ProductVolume,
+    Volume,
+)
+
+
+# =================================== Product cards ===================================
+class ProductCardSyncTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product = Product.objects.create(
+                name="Card Product",
+                description="Card product",
+                status="ACTIVE",
+                category=Category.objects.create(name="Cards"),
+            )
+            self.volume = ProductVolume.objects.create(
+                product=self.product,
+                volume=Volume.objects.create(ml=50),
+                cost=Decimal(10),
+                price=Decimal(15),
+            )
+            self.inventory = Inventory.objects.create(product=self.product, quantity=8)
+
+    def test_writes_refresh_the_card(self):
+        card = ProductCard.objects.get(product=self.product)
+        self.assertEqual((card.min_price, card.max_price), (15, 15))
+        self.assertEqual(card.category_name, "Cards")
+        self.assertEqual(card.quantity, 8)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductVolume.objects.create(
+                product=self.product,
+                volume=Volume.objects.create(ml=100),
+                cost=Decimal(20),
+                price=Decimal(30),
+            )
+        card.refresh_from_db()
+        self.assertEqual((card.min_price, card.max_price), (15, 30))
+
+    def test_refresh_overwrites_the_existing_card(self):
+        # A refresh racing another one finds the card already written
+        Product.objects.filter(pk=self.product.pk).update(name="Renamed")
+        refresh_cards([self.product.pk])
+        refresh_cards([self.product.pk])
+        self.assertEqual(
+            list(ProductCard.objects.values_list("name", "quantity")), [("Renamed", 8)]
+        )
+
+    def test_bulk_stock_update_reaches_the_card(self):
+        self.inventory.quantity = 5
+        _write_stock({self.product.id: 3}, {self.product.id: self.inventory})
+        self.assertEqual(ProductCard.objects.get(product=self.product).quantity, 5)
+
+    def test_rebuild_and_api(self):
+        ProductCard.objects.all().delete()
+        self.assertEqual(rebuild_cards(), 1)
+        response = self.client.get(reverse("products:product_cards"))
+        self.assertEqual(response.status_code, 200)
+        card = response.json()["results"][0]
+        self.assertEqual(card["name"], "Card Product")
+        # Stock levels stay private
+        self.assertTrue(card["in_stock"])
+        self.assertNotIn("quantity", card)
+
+
+# =================================== Image uploads ===================================
+@override_settings(IMAGE_THUMBNAIL_SIZES=(100, 300))
+class ImageUploadPipelineTests(LocalImagesMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product = Product.objects.create(
+                name="Pictured", description="Pictured product", status="ACTIVE"
+            )
+
+    def upload(self, name="shot.png", size=(400, 200)):
+        image = BytesIO()
+        Image.new("RGB", size).save(image, format="PNG")
+        return SimpleUploadedFile(name, image.getvalue(), content_type="image/png")
+
+    def test_upload_is_stored_after_the_request(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            image = ProductImage.objects.create(
+                product=self.product, image=self.upload(), is_default=True
+            )
+        # The save only wrote the original to the pending directory
+        self.assertFalse(ProductImage.objects.get(pk=image.pk).image)
+        self.assertEqual(
+            sorted(os.listdir(self.pending_dir)), ["shot.png", "shot.png.json"]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for callback in callbacks:
+                callback()
+
+        url = "http://testserver/media/images/product_images/shot"
+        self.assertEqual(ProductImage.objects.get(pk=image.pk).image.url, url)
+        # Cards show the thumbnail sized for them
+        self.assertEqual(
+            ProductCard.objects.get(product=self.product).image_url, f"{url}_300"
+        )
+        self.assertEqual(os.listdir(self.pending_dir), [])
+        with Image.open(
+            os.path.join(self.image_dir, "product_images", "shot_100")
+        ) as thumbnail:
+            self.assertEqual(thumbnail.size, (100, 50))
+
+    def test_failed_upload_is_logged_and_cleaned_up(self):
+        with mock.patch.object(
+            LocalImageStorage, "store", side_effect=OSError("disk full")
+        ), self.assertLogs("apps.main.images", "ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                image = ProductImage.objects.create(
+                    product=self.product, image=self.upload()
+                )
+        self.assertFalse(ProductImage.objects.get(pk=image.pk).image)
+        self.assertEqual(os.listdir(self.pending_dir), [])
+
+    def test_sweep_stores_uploads_whose_task_was_lost(self):
+        # Never running the callbacks stands in for a restart
+        with self.captureOnCommitCallbacks():
+            image = ProductImage.objects.create(
+                product=self.product, image=self.upload()
+            )
+        with open(os.path.join(self.pending_dir, "stray.png"), "wb") as stray:
+            stray.write(b"left behind")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("process_pending_images", min_age=0, stdout=StringIO())
+        self.assertEqual(
+            ProductImage.objects.get(pk=image.pk).image.url,
+            "http://testserver/media/images/product_images/shot",
+        )
+        self.assertEqual(os.listdir(self.pending_dir), [])
+
+    def test_replacing_an_image_keeps_the_old_one_until_stored(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            volume = ProductVolume.objects.create(
+                product=self.product,
+                volume=Volume.objects.create(ml=50),
+                cost=Decimal(10),
+                price=Decimal(15),
+                image=self.upload("first.png"),
+            )
+        first = ProductVolume.objects.get(pk=volume.pk).image.url
+
+        volume.image = self.upload("second.png")
+        with self.captureOnCommitCallbacks() as callbacks:
+            volume.save()
+        self.assertEqual(ProductVolume.objects.get(pk=volume.pk).image.url, first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for callback in callbacks:
+                callback()
+        self.assertTrue(
+            ProductVolume.objects.get(pk=volume.pk).image.url.endswith("/second")
+        )
@@ -1,6 +1,7 @@
 # urls.py
 from django.urls import path
 from . import views
+from .viewset import ProductCardListView
 
 app_name = "products"
 
@@ -65,4 +66,6 @@ urlpatterns = [
     ),
     # ** Stock Alerts **
     path("stock-alerts/", views.stock_alerts_view, name="stock_alerts"),
+    # ** Catalog API **
+    path("api/cards/", ProductCardListView.as_view(), name="product_cards"),
 ]
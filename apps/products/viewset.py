@@ -0,0 +1,46 @@
+from decimal import Decimal, InvalidOperation
+
+from rest_framework.generics import ListAPIView
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import AllowAny
+
+from .cards import filter_cards_by_price
+from .models import ProductCard
+from .serializers import ProductCardSerializer
+
+
+class ProductCardPagination(PageNumberPagination):
+    page_size = 24
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+class ProductCardListView(ListAPIView):
+    """
+    Public catalog listing read from the product cards, optionally filtered
+    by ``category`` id, ``min_price``/``max_price`` and a ``search`` on the
+    product name.
+    """
+
+    permission_classes = (AllowAny,)
+    serializer_class = ProductCardSerializer
+    pagination_class = ProductCardPagination
+
+    def get_queryset(self):
+        cards = ProductCard.objects.filter(status="ACTIVE").order_by("product_id")
+        category = self.request.query_params.get("category")
+        if category and category.isdigit():
+            cards = cards.filter(category_id=category)
+        cards = filter_cards_by_price(
+            cards, self._price("min_price"), self._price("max_price")
+        )
+        search = self.request.query_params.get("search")
+        if search:
+            cards = cards.filter(name__icontains=search)
+        return cards
+
+    def _price(self, name):
+        try:
+            return Decimal(self.request.query_params[name])
+        except (KeyError, InvalidOperation):
+            return None
@@ -0,0 +1,264 @@
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+from apps.inventory.models import Inventory
+from apps.main.metrics import cached_metric
+from apps.products.models import Product, ProductVolume
+from .models import SaleDetail
+
+logger = logging.getLogger(__name__)
+
+# Period lengths offered on the analytics page, in days
+ANALYTICS_PERIODS = (30, 90, 180, 365)
+# Cumulative revenue share closing the A and B classes
+ABC_THRESHOLDS = (0.80, 0.95)
+ANALYTICS_CACHE_TIMEOUT = 60 * 60 * 24
+
+HISTORY_DTYPE = np.dtype(
+    [
+        ("product", "i8"),
+        ("volume", "i8"),
+        ("day", "i8"),
+        ("quantity", "i8"),
+        ("revenue", "f8"),
+        ("cogs", "f8"),
+    ]
+)
+
+
+# =================================== Sales history ===================================
+def load_sales_history(start_date, end_date):
+    """
+    Stream the sale lines dated ``start_date``..``end_date`` into a columnar
+    numpy array, one row per line with the day as a date ordinal.
+    """
+    rows = (
+        SaleDetail.objects.filter(sale__trans_date__range=[start_date, end_date])
+        .values_list(
+            "product_id",
+            "product_volume_id",
+            "sale__trans_date",
+            "quantity",
+            "total_detail",
+            "unit_cost",
+        )
+        .iterator(chunk_size=5000)
+    )
+    return np.fromiter(
+        (
+            (
+                product,
+                volume or 0,
+                day.toordinal(),
+                quantity,
+                total,
+                float(cost) * quantity,
+            )
+            for product, volume, day, quantity, total, cost in rows
+        ),
+        dtype=HISTORY_DTYPE,
+    )
+
+
+def _ratio(numerator, denominator):
+    """Element-wise ``numerator / denominator`` with NaN where it is undefined."""
+    result = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=result, where=denominator > 0)
+    return result
+
+
+def _number(value, digits=2):
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+# =================================== Analytics ===================================
+def compute_sales_analytics(days=30, today=None):
+    """
+    ABC class, velocity, sell-through, margin contribution and the change
+    against the previous period for every product volume sold in the last
+    ``days`` full days.
+    """
+    return add_stock_levels(compute_sales_history(days, today))
+
+
+def compute_sales_history(days=30, today=None):
+    """
+    Every figure of ``compute_sales_analytics`` that only depends on the sale
+    lines, computed in one vectorized pass over them. Sell-through and days
+    of cover are left to ``add_stock_levels``.
+    """
+    today = today or date.today()
+    end_date = today - timedelta(days=1)
+    start_date = end_date - timedelta(days=days - 1)
+    previous_start = start_date - timedelta(days=days)
+
+    summary = {
+        "days": days,
+        "start_date": start_date,
+        "end_date": end_date,
+        "revenue": 0.0,
+        "previous_revenue": 0.0,
+        "revenue_change_pct": None,
+        "margin": 0.0,
+        "units": 0,
+        "classes": {"A": 0, "B": 0, "C": 0},
+    }
+
+    history = load_sales_history(previous_start, end_date)
+    if not history.size:
+        return {"summary": summary, "rows": []}
+
+    # One group per (product, volume)
+    keys, index = np.unique(
+        np.stack([history["product"], history["volume"]], axis=1),
+        axis=0,
+        return_inverse=True,
+    )
+    index = index.ravel()
+    groups = len(keys)
+    current = history["day"] >= start_date.toordinal()
+
+    def group_sum(column, mask):
+        return np.bincount(
+            index, weights=np.where(mask, history[column], 0), minlength=groups
+        )
+
+    units = group_sum("quantity", current)
+    revenue = group_sum("revenue", current)
+    cogs = group_sum("cogs", current)
+    previous_revenue = group_sum("revenue", ~current)
+    margin = revenue - cogs
+
+    # ABC: classes close once the revenue ranked above an item reaches the thresholds
+    order = np.argsort(-revenue, kind="stable")
+    total_revenue = revenue.sum()
+    share_before = np.zeros(groups)
+    if total_revenue > 0:
+        share_before[order] = (
+            np.cumsum(revenue[order]) - revenue[order]
+        ) / total_revenue
+    abc = np.where(
+        share_before < ABC_THRESHOLDS[0],
+        "A",
+        np.where(share_before < ABC_THRESHOLDS[1], "B", "C"),
+    )
+    abc[revenue <= 0] = "C"
+
+    velocity = units / days
+    product_ids = np.unique(keys[:, 0])
+
+    total_margin = margin.sum()
+    contribution = margin / total_margin if total_margin else np.zeros(groups)
+    change = revenue - previous_revenue
+    change_pct = _ratio(change, previous_revenue)
+
+    names = dict(
+        Product.objects.filter(id__in=product_ids.tolist()).values_list("id", "name")
+    )
+    volumes = dict(
+        ProductVolume.objects.filter(id__in=keys[:, 1].tolist()).values_list(
+            "id", "volume__ml"
+        )
+    )
+
+    rows = [
+        {
+            "product_id": int(keys[i, 0]),
+            "product": names.get(int(keys[i, 0])),
+            "volume": volumes.get(int(keys[i, 1])),
+            "abc_class": str(abc[i]),
+            "units": int(units[i]),
+            "revenue": round(float(revenue[i]), 2),
+            "margin": round(float(margin[i]), 2),
+            "margin_contribution_pct": round(float(contribution[i]) * 100, 2),
+            "velocity": round(float(velocity[i]), 2),
+            "previous_revenue": round(float(previous_revenue[i]), 2),
+            "revenue_change": round(float(change[i]), 2),
+            "revenue_change_pct": _number(change_pct[i] * 100),
+        }
+        for i in order.tolist()
+    ]
+
+    total_previous = float(previous_revenue.sum())
+    summary.update(
+        {
+            "revenue": round(float(total_revenue), 2),
+            "previous_revenue": round(total_previous, 2),
+            "revenue_change_pct": (
+                round(float(total_revenue - total_previous) / total_previous * 100, 2)
+                if total_previous > 0
+                else None
+            ),
+            "margin": round(float(total_margin), 2),
+            "units": int(units.sum()),
+            "classes": {
+                abc_class: int(np.count_nonzero(abc == abc_class))
+                for abc_class in ("A", "B", "C")
+            },
+        }
+    )
+    logger.info(
+        f"Sales analytics computed for {groups} volume(s) over {len(history)} line(s)"
+    )
+    return {"summary": summary, "rows": rows}
+
+
+def add_stock_levels(analytics):
+    """
+    Copy of ``analytics`` with the sell-through and days of cover of each row
+    taken from the current stock. Both are per product, since stock is.
+    """
+    days = analytics["summary"]["days"]
+    product_units = {}
+    for row in analytics["rows"]:
+        product_units[row["product_id"]] = (
+            product_units.get(row["product_id"], 0) + row["units"]
+        )
+    stock = (
+        dict(
+            Inventory.objects.filter(product_id__in=list(product_units)).values_list(
+                "product_id", "quantity"
+            )
+        )
+        if product_units
+        else {}
+    )
+
+    rows = []
+    for row in analytics["rows"]:
+        units = product_units[row["product_id"]]
+        quantity = stock.get(row["product_id"], 0)
+        rows.append(
+            {
+                **row,
+                "sell_through_pct": (
+                    round(units / (units + quantity) * 100, 2)
+                    if units + quantity > 0
+                    else None
+                ),
+                "days_of_cover": (
+                    round(quantity / (units / days), 1) if units > 0 else None
+                ),
+            }
+        )
+    return {"summary": analytics["summary"], "rows": rows}
+
+
+def get_sales_history_analytics(days=30):
+    """
+    The sale-line figures for the last ``days`` full days, cached for the day.
+    Sales posted today are outside the window, so they do not invalidate it.
+    """
+    today = date.today()
+    return cached_metric(
+        f"sales-analytics:{today.isoformat()}:{days}",
+        lambda: compute_sales_history(days, today),
+        [],
+        ANALYTICS_CACHE_TIMEOUT,
+    )
+
+
+def get_sales_analytics(days=30):
+    """Analytics for the last ``days`` full days, with today's stock levels."""
+    return add_stock_levels(get_sales_history_analytics(days))
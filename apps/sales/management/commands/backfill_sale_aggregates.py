@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.sales.models import Sale, SaleDetail, sale_line_aggregates
+
+
+class Command(BaseCommand):
+    help = "Backfill the stored item count, COGS and profit of existing sales."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of sales updated per transaction (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        last_id = 0
+        updated = 0
+
+        while True:
+            sales = list(
+                Sale.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id")[:chunk_size]
+            )
+            if not sales:
+                break
+            last_id = sales[-1].id
+
+            # One grouped aggregate per chunk
+            totals = {
+                row["sale_id"]: row
+                for row in SaleDetail.objects.filter(
+                    sale_id__gte=sales[0].id, sale_id__lte=last_id
+                )
+                .values("sale_id")
+                .annotate(**sale_line_aggregates())
+            }
+
+            for sale in sales:
+                row = totals.get(sale.id)
+                sale.item_count = row["item_count"] if row else 0
+                sale.cogs_total = row["cogs_total"] if row else 0
+                sale.profit_total = row["revenue"] - row["cogs_total"] if row else 0
+
+            with transaction.atomic():
+                Sale.objects.bulk_update(
+                    sales, ["item_count", "cogs_total", "profit_total"]
+                )
+            updated += len(sales)
+            self.stdout.write(f"Backfilled {updated} sales...")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} sales."))
@@ -0,0 +1,54 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max, Min
+
+from apps.sales.models import Sale
+from apps.sales.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily sales, payment method and product rollups from the "
+        "posted sales. Run after the backfill or any bulk edit of sales."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            help="First day to rebuild, YYYY-MM-DD (default: first sale).",
+        )
+        parser.add_argument(
+            "--end-date",
+            type=date.fromisoformat,
+            help="Last day to rebuild, YYYY-MM-DD (default: last sale).",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=31,
+            help="Number of days rebuilt per transaction (default: 31).",
+        )
+
+    def handle(self, *args, **options):
+        bounds = Sale.objects.aggregate(first=Min("trans_date"), last=Max("trans_date"))
+        start_date = options["start_date"] or bounds["first"]
+        end_date = options["end_date"] or bounds["last"]
+        if start_date is None or end_date is None:
+            self.stdout.write(self.style.WARNING("No sales to roll up."))
+            return
+        if start_date > end_date:
+            raise CommandError("--start-date must not be after --end-date.")
+
+        step = timedelta(days=max(options["days"], 1))
+        chunk_start = start_date
+        while chunk_start <= end_date:
+            chunk_end = min(chunk_start + step - timedelta(days=1), end_date)
+            rebuild_rollups(chunk_start, chunk_end)
+            self.stdout.write(f"Rebuilt rollups for {chunk_start} to {chunk_end}...")
+            chunk_start = chunk_end + timedelta(days=1)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt rollups for {start_date} to {end_date}.")
+        )
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.sales.rollups import rebuild_top_sellers
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the top-seller counters from the daily product rollups. Run "
+        "after rebuild_sales_rollups or if the counters look out of step."
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = rebuild_top_sellers()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} top-seller counters."))
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:40
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_sale_aggregates(apps, schema_editor):
+    # Store the line totals of existing sales in one statement. Lines have no
+    # unit cost yet, so use the volume cost that 0008 snapshots onto them
+    Sale = apps.get_model("sales", "Sale")
+    SaleDetail = apps.get_model("sales", "SaleDetail")
+
+    def line_total(expression, output_field):
+        return Coalesce(
+            Subquery(
+                SaleDetail.objects.filter(sale_id=OuterRef("pk"))
+                .order_by()
+                .values("sale_id")
+                .annotate(total=Sum(expression, output_field=output_field))
+                .values("total")
+            ),
+            Value(0),
+            output_field=output_field,
+        )
+
+    cost = Coalesce(F("product_volume__cost"), Value(0)) * F("quantity")
+    Sale.objects.update(
+        item_count=line_total(F("quantity"), models.IntegerField()),
+        cogs_total=line_total(cost, FloatField()),
+        profit_total=line_total(F("total_detail") - cost, FloatField()),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sales", "0006_saledetail_product_volume"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sale",
+            name="cogs_total",
+            field=models.FloatField(default=0, verbose_name="Cost of Goods Sold"),
+        ),
+        migrations.AddField(
+            model_name="sale",
+            name="item_count",
+            field=models.PositiveIntegerField(default=0, verbose_name="Items"),
+        ),
+        migrations.AddField(
+            model_name="sale",
+            name="profit_total",
+            field=models.FloatField(default=0, verbose_name="Profit"),
+        ),
+        migrations.RunPython(fill_sale_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def capture_unit_costs(apps, schema_editor):
+    # Snapshot the current volume cost onto historical lines in one statement
+    SaleDetail = apps.get_model("sales", "SaleDetail")
+    ProductVolume = apps.get_model("products", "ProductVolume")
+    SaleDetail.objects.filter(product_volume__isnull=False).update(
+        unit_cost=Subquery(
+            ProductVolume.objects.filter(pk=OuterRef("product_volume_id")).values(
+                "cost"
+            )[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0004_alter_category_description"),
+        ("sales", "0007_sale_cogs_total_sale_item_count_sale_profit_total"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="saledetail",
+            name="unit_cost",
+            field=models.DecimalField(
+                decimal_places=2, default=0, max_digits=10, verbose_name="Unit Cost"
+            ),
+        ),
+        migrations.RunPython(capture_unit_costs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,216 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:45
+
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, Sum
+import django.db.models.deletion
+
+
+def build_rollups(apps, schema_editor):
+    # Fill the rollups from the sales already posted, so reports stay correct
+    # from the first request after the deploy
+    Sale = apps.get_model("sales", "Sale")
+    SaleDetail = apps.get_model("sales", "SaleDetail")
+    DailySalesSummary = apps.get_model("sales", "DailySalesSummary")
+    DailyPaymentMethodSummary = apps.get_model("sales", "DailyPaymentMethodSummary")
+    DailyProductSummary = apps.get_model("sales", "DailyProductSummary")
+
+    sale_totals = {
+        "gross_total": Sum("grand_total"),
+        "tax_total": Sum("tax_amount"),
+        "transactions": Count("id"),
+    }
+    line_totals = {
+        "revenue": Sum("total_detail"),
+        "items": Sum("quantity"),
+        "cogs_total": Sum(F("unit_cost") * F("quantity"), output_field=FloatField()),
+    }
+    lines = SaleDetail.objects.order_by()
+
+    by_day = {
+        row.pop("sale__trans_date"): row
+        for row in lines.values("sale__trans_date").annotate(**line_totals)
+    }
+    DailySalesSummary.objects.bulk_create(
+        [
+            DailySalesSummary(
+                date=row["trans_date"],
+                gross_total=row["gross_total"],
+                tax_total=row["tax_total"],
+                transactions=row["transactions"],
+                **by_day.get(row["trans_date"], {}),
+            )
+            for row in Sale.objects.order_by()
+            .values("trans_date")
+            .annotate(**sale_totals)
+        ],
+        batch_size=1000,
+    )
+
+    by_method = {
+        (row.pop("sale__trans_date"), row.pop("sale__payment_method")): row
+        for row in lines.values("sale__trans_date", "sale__payment_method").annotate(
+            **line_totals
+        )
+    }
+    DailyPaymentMethodSummary.objects.bulk_create(
+        [
+            DailyPaymentMethodSummary(
+                date=row["trans_date"],
+                payment_method=row["payment_method"],
+                gross_total=row["gross_total"],
+                tax_total=row["tax_total"],
+                transactions=row["transactions"],
+                **by_method.get((row["trans_date"], row["payment_method"]), {}),
+            )
+            for row in Sale.objects.order_by()
+            .values("trans_date", "payment_method")
+            .annotate(**sale_totals)
+        ],
+        batch_size=1000,
+    )
+
+    DailyProductSummary.objects.bulk_create(
+        [
+            DailyProductSummary(date=row.pop("sale__trans_date"), **row)
+            for row in lines.values("sale__trans_date", "product_id").annotate(
+                transactions=Count("sale_id", distinct=True), **line_totals
+            )
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0004_alter_category_description"),
+        ("sales", "0008_saledetail_unit_cost"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailySalesSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(unique=True, verbose_name="Date")),
+                (
+                    "gross_total",
+                    models.FloatField(default=0, verbose_name="Gross Total"),
+                ),
+                ("tax_total", models.FloatField(default=0, verbose_name="Tax")),
+                ("revenue", models.FloatField(default=0, verbose_name="Line Revenue")),
+                ("items", models.IntegerField(default=0, verbose_name="Items Sold")),
+                (
+                    "cogs_total",
+                    models.FloatField(default=0, verbose_name="Cost of Goods Sold"),
+                ),
+                (
+                    "transactions",
+                    models.IntegerField(default=0, verbose_name="Transactions"),
+                ),
+            ],
+            options={
+                "verbose_name": "Daily Sales Summary",
+                "verbose_name_plural": "Daily Sales Summaries",
+                "db_table": "daily_sales_summary",
+                "ordering": ["date"],
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyPaymentMethodSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "payment_method",
+                    models.CharField(
+                        choices=[
+                            ("CREDIT_CARD", "Credit Card"),
+                            ("DEBIT_CARD", "Debit Card"),
+                            ("PAYPAL", "PayPal"),
+                            ("BANK_TRANSFER", "Bank Transfer"),
+                            ("CASH", "Cash"),
+                            ("MTN_MOBILE_MONEY", "MTN Mobile Money"),
+                            ("AIRTEL_MONEY", "Airtel Money"),
+                        ],
+                        max_length=50,
+                        verbose_name="Payment Method",
+                    ),
+                ),
+                (
+                    "gross_total",
+                    models.FloatField(default=0, verbose_name="Gross Total"),
+                ),
+                ("tax_total", models.FloatField(default=0, verbose_name="Tax")),
+                ("revenue", models.FloatField(default=0, verbose_name="Line Revenue")),
+                ("items", models.IntegerField(default=0, verbose_name="Items Sold")),
+                (
+                    "cogs_total",
+                    models.FloatField(default=0, verbose_name="Cost of Goods Sold"),
+                ),
+                (
+                    "transactions",
+                    models.IntegerField(default=0, verbose_name="Transactions"),
+                ),
+            ],
+            options={
+                "db_table": "daily_payment_method_summary",
+                "ordering": ["date", "payment_method"],
+                "unique_together": {("date", "payment_method")},
+            },
+        ),
+        migrations.CreateModel(
+            name="DailyProductSummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Date")),
+                ("revenue", models.FloatField(default=0, verbose_name="Line Revenue")),
+                ("items", models.IntegerField(default=0, verbose_name="Items Sold")),
+                (
+                    "cogs_total",
+                    models.FloatField(default=0, verbose_name="Cost of Goods Sold"),
+                ),
+                (
+                    "transactions",
+                    models.IntegerField(default=0, verbose_name="Transactions"),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "daily_product_summary",
+                "ordering": ["date", "product"],
+                "unique_together": {("date", "product")},
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
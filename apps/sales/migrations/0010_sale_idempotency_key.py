@@ -0,0 +1,20 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sales", "0009_daily_sales_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sale",
+            name="idempotency_key",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, null=True, unique=True
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.16 on 2026-10-18 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("sales", "0010_sale_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReceiptSequence",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("branch", models.CharField(max_length=10, verbose_name="Branch")),
+                ("date", models.DateField(verbose_name="Date")),
+                (
+                    "next_number",
+                    models.PositiveIntegerField(default=1, verbose_name="Next Number"),
+                ),
+            ],
+            options={
+                "db_table": "receipt_sequences",
+                "unique_together": {("branch", "date")},
+            },
+        ),
+    ]
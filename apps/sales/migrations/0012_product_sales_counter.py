@@ -0,0 +1,91 @@
+# Generated by Django 4.2.16 on 2026-10-18 12:11
+
+import datetime
+
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+import django.db.models.deletion
+
+
+def build_counters(apps, schema_editor):
+    DailyProductSummary = apps.get_model("sales", "DailyProductSummary")
+    ProductSalesCounter = apps.get_model("sales", "ProductSalesCounter")
+
+    totals = {"items": Sum("items"), "revenue": Sum("revenue")}
+    rows = DailyProductSummary.objects.order_by()
+    counters = [
+        ProductSalesCounter(period="all", period_start=datetime.date(2000, 1, 1), **row)
+        for row in rows.values("product_id").annotate(**totals)
+    ]
+    for period, trunc in (
+        ("year", TruncYear),
+        ("month", TruncMonth),
+        ("week", TruncWeek),
+    ):
+        counters.extend(
+            ProductSalesCounter(period=period, **row)
+            for row in rows.annotate(period_start=trunc("date"))
+            .values("period_start", "product_id")
+            .annotate(**totals)
+        )
+    ProductSalesCounter.objects.bulk_create(counters, batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0005_product_cards"),
+        ("sales", "0011_receiptsequence"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductSalesCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[
+                            ("all", "All Time"),
+                            ("year", "This Year"),
+                            ("month", "This Month"),
+                            ("week", "This Week"),
+                        ],
+                        max_length=10,
+                        verbose_name="Period",
+                    ),
+                ),
+                ("period_start", models.DateField(verbose_name="Period Start")),
+                ("items", models.IntegerField(default=0, verbose_name="Items Sold")),
+                ("revenue", models.FloatField(default=0, verbose_name="Line Revenue")),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="products.product",
+                    ),
+                ),
+            ],
+            options={
+                "db_table": "product_sales_counter",
+                "indexes": [
+                    models.Index(
+                        fields=["period", "period_start", "-items"],
+                        name="product_sales_counter_top_idx",
+                    )
+                ],
+                "unique_together": {("period", "period_start", "product")},
+            },
+        ),
+        migrations.RunPython(build_counters, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import F, Sum, FloatField
+from django.db.models.functions import Coalesce
+import datetime
 from decimal import Decimal
 import django.utils.timezone
 from apps.customers.models import Customer
@@ -22,6 +25,18 @@ SALE_TYPE_CHOICES = [
 ]
 
 
+def sale_line_aggregates():
+    """Aggregates over SaleDetail rows used to fill the stored Sale totals."""
+    return {
+        "item_count": Coalesce(Sum("quantity"), 0),
+        "cogs_total": Coalesce(
+            Sum(F("unit_cost") * F("quantity"), output_field=FloatField()),
+            0.0,
+        ),
+        "revenue": Coalesce(Sum("total_detail"), 0.0),
+    }
+
+
 # =================================== Sale model ===================================
 class Sale(models.Model):
     order = models.ForeignKey(
@@ -33,6 +48,10 @@ class Sale(models.Model):
     date_added = models.DateTimeField(default=django.utils.timezone.now)
     trans_date = models.DateField(verbose_name="Receipt Date")
     receipt_number = models.CharField(max_length=50, unique=True, blank=True, null=True)
+    # Client-generated key that makes offline POS submissions safe to retry
+    idempotency_key = models.CharField(
+        max_length=64, unique=True, blank=True, null=True, editable=False
+    )
     customer = models.ForeignKey(
         Customer, related_name="sales", on_delete=models.SET_NULL, null=True, blank=True
     )
@@ -47,6 +66,10 @@ class Sale(models.Model):
         choices=PAYMENT_METHOD_CHOICES,
         default="CASH",
     )
+    # Stored line aggregates, filled when the sale is posted
+    item_count = models.PositiveIntegerField(default=0, verbose_name="Items")
+    cogs_total = models.FloatField(default=0, verbose_name="Cost of Goods Sold")
+    profit_total = models.FloatField(default=0, verbose_name="Profit")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Updated at")
 
@@ -64,26 +87,49 @@ class Sale(models.Model):
         )
 
     def sum_items(self):
-        details = SaleDetail.objects.filter(sale=self.id)
-        return sum([d.quantity for d in details])
+        return self.item_count
 
     def total_profit(self):
-        """Calculate total profit for the sale."""
-        profit = 0
-        for item in self.items.all():
-            for volume in item.product.volumes.all():
-                profit += (volume.price - volume.cost) * item.quantity
-        return profit
+        """Return the stored profit for the sale."""
+        return self.profit_total
 
     def total_items(self):
-        """Calculate total number of items sold in the sale."""
-        return sum([item.quantity for item in self.items.all()])
+        """Return the stored number of items sold in the sale."""
+        return self.item_count
+
+    def refresh_aggregates(self):
+        """Recompute the stored item count, COGS and profit from the sale lines."""
+        totals = self.items.aggregate(**sale_line_aggregates())
+        self.item_count = totals["item_count"]
+        self.cogs_total = totals["cogs_total"]
+        self.profit_total = totals["revenue"] - totals["cogs_total"]
+        Sale.objects.filter(pk=self.pk).update(
+            item_count=self.item_count,
+            cogs_total=self.cogs_total,
+            profit_total=self.profit_total,
+        )
 
     def total_revenue(self):
         """Return the total revenue for the sale."""
         return self.grand_total
 
 
+# =================================== Receipt sequence model ===================================
+class ReceiptSequence(models.Model):
+    """Next unreserved receipt number per branch and day."""
+
+    branch = models.CharField(max_length=10, verbose_name="Branch")
+    date = models.DateField(verbose_name="Date")
+    next_number = models.PositiveIntegerField(default=1, verbose_name="Next Number")
+
+    class Meta:
+        db_table = "receipt_sequences"
+        unique_together = ("branch", "date")
+
+    def __str__(self):
+        return f"{self.branch} | {self.date} | Next: {self.next_number}"
+
+
 # =================================== SaleDetail model ===================================
 class SaleDetail(models.Model):
     sale = models.ForeignKey(Sale, related_name="items", on_delete=models.CASCADE)
@@ -92,6 +138,10 @@ class SaleDetail(models.Model):
         ProductVolume, null=True, blank=True, on_delete=models.CASCADE
     )  # New field to track product volume
     price = models.FloatField()
+    # Cost price of the volume at the time of sale
+    unit_cost = models.DecimalField(
+        max_digits=10, decimal_places=2, default=0, verbose_name="Unit Cost"
+    )
     quantity = models.IntegerField()
     total_detail = models.FloatField()  # Total for the sale detail (price * quantity)
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Created at")
@@ -118,3 +168,97 @@ class SaleDetail(models.Model):
     def volume_ml(self):
         """Return the volume in ml if available."""
         return self.product_volume.volume.ml if self.product_volume else None
+
+
+# =================================== Daily sales rollups ===================================
+class DailySalesSummary(models.Model):
+    date = models.DateField(unique=True, verbose_name="Date")
+    gross_total = models.FloatField(default=0, verbose_name="Gross Total")
+    tax_total = models.FloatField(default=0, verbose_name="Tax")
+    revenue = models.FloatField(default=0, verbose_name="Line Revenue")
+    items = models.IntegerField(default=0, verbose_name="Items Sold")
+    cogs_total = models.FloatField(default=0, verbose_name="Cost of Goods Sold")
+    transactions = models.IntegerField(default=0, verbose_name="Transactions")
+
+    class Meta:
+        db_table = "daily_sales_summary"
+        verbose_name = "Daily Sales Summary"
+        verbose_name_plural = "Daily Sales Summaries"
+        ordering = ["date"]
+
+    def __str__(self):
+        return f"{self.date} | Gross Total: {self.gross_total}"
+
+
+class DailyPaymentMethodSummary(models.Model):
+    date = models.DateField(verbose_name="Date")
+    payment_method = models.CharField(
+        max_length=50, choices=PAYMENT_METHOD_CHOICES, verbose_name="Payment Method"
+    )
+    gross_total = models.FloatField(default=0, verbose_name="Gross Total")
+    tax_total = models.FloatField(default=0, verbose_name="Tax")
+    revenue = models.FloatField(default=0, verbose_name="Line Revenue")
+    items = models.IntegerField(default=0, verbose_name="Items Sold")
+    cogs_total = models.FloatField(default=0, verbose_name="Cost of Goods Sold")
+    transactions = models.IntegerField(default=0, verbose_name="Transactions")
+
+    class Meta:
+        db_table = "daily_payment_method_summary"
+        unique_together = ("date", "payment_method")
+        ordering = ["date", "payment_method"]
+
+    def __str__(self):
+        return f"{self.date} | {self.payment_method} | Gross Total: {self.gross_total}"
+
+
+class DailyProductSummary(models.Model):
+    date = models.DateField(verbose_name="Date")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    revenue = models.FloatField(default=0, verbose_name="Line Revenue")
+    items = models.IntegerField(default=0, verbose_name="Items Sold")
+    cogs_total = models.FloatField(default=0, verbose_name="Cost of Goods Sold")
+    transactions = models.IntegerField(default=0, verbose_name="Transactions")
+
+    class Meta:
+        db_table = "daily_product_summary"
+        unique_together = ("date", "product")
+        ordering = ["date", "product"]
+
+    def __str__(self):
+        return f"{self.date} | {self.product_id} | Items: {self.items}"
+
+
+# =================================== Top sellers ===================================
+TOP_SELLER_PERIOD_CHOICES = [
+    ("all", "All Time"),
+    ("year", "This Year"),
+    ("month", "This Month"),
+    ("week", "This Week"),
+]
+# period_start of the single all-time bucket
+ALL_TIME_START = datetime.date(2000, 1, 1)
+
+
+class ProductSalesCounter(models.Model):
+    """Running sales of a product within one period bucket (year, month, ...)."""
+
+    period = models.CharField(
+        max_length=10, choices=TOP_SELLER_PERIOD_CHOICES, verbose_name="Period"
+    )
+    period_start = models.DateField(verbose_name="Period Start")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE)
+    items = models.IntegerField(default=0, verbose_name="Items Sold")
+    revenue = models.FloatField(default=0, verbose_name="Line Revenue")
+
+    class Meta:
+        db_table = "product_sales_counter"
+        unique_together = ("period", "period_start", "product")
+        indexes = [
+            models.Index(
+                fields=["period", "period_start", "-items"],
+                name="product_sales_counter_top_idx",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.period} {self.period_start} | {self.product_id} | Items: {self.items}"
@@ -0,0 +1,104 @@
+import logging
+import threading
+from datetime import date
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from .models import ReceiptSequence
+
+logger = logging.getLogger(__name__)
+
+
+# =================================== Receipt number allocation ===================================
+class ReceiptNumberAllocator:
+    """
+    Hands out receipt numbers per branch and day from blocks reserved in the
+    database.
+
+    Each worker process reserves ``block_size`` numbers at a time with one
+    short transaction on the ``ReceiptSequence`` row, then serves the block
+    from memory. Concurrent tills therefore only meet on the counter row once
+    per block. Numbers are never reused; numbers reserved by a worker that
+    exits, or by a sale that fails, are simply skipped.
+    """
+
+    def __init__(self, block_size=None):
+        self.block_size = block_size or settings.RECEIPT_BLOCK_SIZE
+        self._lock = threading.Lock()
+        # (branch, date) -> [next number, end of block (exclusive)]
+        self._blocks = {}
+
+    def _reserve(self, branch, day, count):
+        """Move the stored counter forward by ``count`` and return the first number."""
+        with transaction.atomic():
+            ReceiptSequence.objects.bulk_create(
+                [ReceiptSequence(branch=branch, date=day)], ignore_conflicts=True
+            )
+            sequence = ReceiptSequence.objects.select_for_update().get(
+                branch=branch, date=day
+            )
+            ReceiptSequence.objects.filter(pk=sequence.pk).update(
+                next_number=F("next_number") + count
+            )
+        logger.info(
+            f"Reserved receipt numbers {sequence.next_number}-"
+            f"{sequence.next_number + count - 1} for {branch} on {day}"
+        )
+        return sequence.next_number
+
+    def _forget_before(self, day):
+        # Blocks of past days are rarely needed again, so a long-running
+        # worker keeps one entry per branch instead of one per day served
+        for key in [key for key in self._blocks if key[1] < day]:
+            del self._blocks[key]
+
+    def allocate(self, trans_date, count=1, branch=None):
+        """Return ``count`` formatted receipt numbers for ``trans_date``."""
+        branch = branch or settings.RECEIPT_BRANCH_CODE
+        day = (
+            date.fromisoformat(trans_date)
+            if isinstance(trans_date, str)
+            else trans_date
+        )
+
+        if transaction.get_connection().in_atomic_block:
+            # A rollback would also undo the reservation, so a cached block
+            # could be handed out twice; reserve exactly what is needed instead
+            first = self._reserve(branch, day, count)
+            numbers = range(first, first + count)
+        else:
+            numbers = []
+            with self._lock:
+                block = self._blocks.get((branch, day))
+                while len(numbers) < count:
+                    if block is None or block[0] >= block[1]:
+                        size = max(self.block_size, count - len(numbers))
+                        first = self._reserve(branch, day, size)
+                        self._forget_before(day)
+                        block = self._blocks[(branch, day)] = [first, first + size]
+                    numbers.append(block[0])
+                    block[0] += 1
+
+        return [format_receipt_number(branch, day, number) for number in numbers]
+
+
+def format_receipt_number(branch, day, number):
+    return f"{branch}-{day:%Y%m%d}-{number:06d}"
+
+
+# Shared by every request handled by this worker process
+allocator = ReceiptNumberAllocator()
+
+
+def allocate_receipt_numbers(trans_date, count=1, branch=None):
+    """
+    Allocate ``count`` receipt numbers for sales dated ``trans_date``. Call
+    outside ``transaction.atomic()`` so blocks can be cached between sales.
+    """
+    return allocator.allocate(trans_date, count, branch)
+
+
+def allocate_receipt_number(trans_date, branch=None):
+    return allocate_receipt_numbers(trans_date, 1, branch)[0]
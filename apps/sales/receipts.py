@@ -0,0 +1,75 @@
+import hashlib
+import logging
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.template.loader import render_to_string
+from xhtml2pdf import pisa
+
+from apps.main.tasks import run_in_background
+from .models import Sale
+
+logger = logging.getLogger(__name__)
+
+
+# =================================== Receipt rendering ===================================
+def get_receipt_storage():
+    # Rendered receipts live on local disk, one directory per sale, named by
+    # content hash
+    return FileSystemStorage(location=settings.RECEIPTS_DIR)
+
+
+def render_receipt_html(sale):
+    """Render the receipt template for a sale and return it with its content hash."""
+    details = sale.items.select_related("product").order_by("id")
+    html = render_to_string(
+        "sales/sales_receipt_pdf.html", {"sale": sale, "details": details}
+    )
+    digest = hashlib.sha256(html.encode("utf-8")).hexdigest()[:16]
+    return html, digest
+
+
+def receipt_name(sale_id, digest):
+    return f"{sale_id}/{digest}.pdf"
+
+
+def ensure_receipt_pdf(sale, html, digest):
+    """
+    Return the storage name of the receipt PDF, converting ``html`` only when
+    no file exists yet for this content hash. Returns None if pisa fails.
+    """
+    receipt_storage = get_receipt_storage()
+    name = receipt_name(sale.id, digest)
+    if receipt_storage.exists(name):
+        return name
+
+    output = BytesIO()
+    pisa_status = pisa.CreatePDF(html, dest=output)
+    if pisa_status.err:
+        logger.error(f"Error generating receipt PDF for sale {sale.id}")
+        return None
+
+    receipt_storage.save(name, ContentFile(output.getvalue()))
+
+    # Drop receipts rendered from an older version of the sale
+    _, files = receipt_storage.listdir(str(sale.id))
+    for stale in files:
+        if stale != f"{digest}.pdf":
+            receipt_storage.delete(f"{sale.id}/{stale}")
+    logger.info(f"Receipt rendered for sale {sale.id}: {name}")
+    return name
+
+
+def build_receipt(sale_id):
+    """Render and store the receipt PDF for ``sale_id`` if it is not cached."""
+    sale = Sale.objects.select_related("customer").filter(id=sale_id).first()
+    if sale:
+        html, digest = render_receipt_html(sale)
+        ensure_receipt_pdf(sale, html, digest)
+
+
+def schedule_receipt(sale):
+    """Pre-render the receipt off the request thread once the sale commits."""
+    run_in_background(build_receipt, sale.id)
@@ -0,0 +1,311 @@
+import logging
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Sum, Value, When
+from django.db.models.functions import TruncMonth, TruncWeek, TruncYear
+
+from apps.main.metrics import SALES, invalidate_metrics
+from .models import (
+    ALL_TIME_START,
+    DailyPaymentMethodSummary,
+    DailyProductSummary,
+    DailySalesSummary,
+    ProductSalesCounter,
+    Sale,
+    SaleDetail,
+)
+
+logger = logging.getLogger(__name__)
+
+# Rollups rebuilt by deleting and recreating their rows; the per-day rows
+# are rebuilt in place, under a lock
+REPLACED_ROLLUP_MODELS = (DailyPaymentMethodSummary, DailyProductSummary)
+
+
+# =================================== Incremental updates ===================================
+def _increment_rows(model, row, deltas, key_field=None):
+    """
+    Add ``deltas`` to the rollup rows of ``model`` matching ``row``, e.g.
+    ``{"date": day}``.
+
+    ``deltas`` maps a key value (the payment method, the product id, or None
+    for the per-day table) to ``{field: delta}``. Missing rows are inserted
+    with zeros first, then every row is incremented in a single UPDATE so
+    concurrent sales on the same day never overwrite each other.
+    """
+    if not deltas:
+        return
+
+    if key_field is None:
+        model.objects.bulk_create([model(**row)], ignore_conflicts=True)
+        model.objects.filter(**row).update(
+            **{field: F(field) + Value(delta) for field, delta in deltas[None].items()}
+        )
+        return
+
+    model.objects.bulk_create(
+        [model(**row, **{key_field: key}) for key in deltas],
+        ignore_conflicts=True,
+    )
+    fields = next(iter(deltas.values())).keys()
+    model.objects.filter(**row, **{f"{key_field}__in": list(deltas)}).update(
+        **{
+            field: F(field)
+            + Case(
+                *[
+                    When(**{key_field: key}, then=Value(values[field]))
+                    for key, values in deltas.items()
+                ],
+                default=Value(0),
+                output_field=(
+                    IntegerField()
+                    if field in ("items", "transactions")
+                    else FloatField()
+                ),
+            )
+            for field in fields
+        }
+    )
+
+
+def _apply_sales(posted, sign):
+    """Add (``sign=1``) or subtract (``sign=-1``) ``(sale, details)`` pairs."""
+    daily, by_method, by_product = {}, {}, {}
+    for sale, details in posted:
+        sale_deltas = {
+            "gross_total": sign * sale.grand_total,
+            "tax_total": sign * sale.tax_amount,
+            "revenue": sign * sum(detail.total_detail for detail in details),
+            "items": sign * sum(detail.quantity for detail in details),
+            "cogs_total": sign
+            * sum(float(detail.unit_cost) * detail.quantity for detail in details),
+            "transactions": sign,
+        }
+        for target, key in (
+            (daily.setdefault(sale.trans_date, {}), None),
+            (by_method.setdefault(sale.trans_date, {}), sale.payment_method),
+        ):
+            values = target.setdefault(key, dict.fromkeys(sale_deltas, 0))
+            for field, delta in sale_deltas.items():
+                values[field] += delta
+
+        products = by_product.setdefault(sale.trans_date, {})
+        for product_id in {detail.product_id for detail in details}:
+            products.setdefault(
+                product_id,
+                {"revenue": 0.0, "items": 0, "cogs_total": 0.0, "transactions": 0},
+            )["transactions"] += sign
+        for detail in details:
+            values = products[detail.product_id]
+            values["revenue"] += sign * detail.total_detail
+            values["items"] += sign * detail.quantity
+            values["cogs_total"] += sign * float(detail.unit_cost) * detail.quantity
+
+    # The per-day row goes first: rebuild_rollups locks it to keep sales out
+    for day, deltas in daily.items():
+        _increment_rows(DailySalesSummary, {"date": day}, deltas)
+        _increment_rows(
+            DailyPaymentMethodSummary,
+            {"date": day},
+            by_method[day],
+            key_field="payment_method",
+        )
+        _increment_rows(
+            DailyProductSummary,
+            {"date": day},
+            by_product[day],
+            key_field="product_id",
+        )
+    _apply_counters(by_product)
+
+
+# =================================== Top-seller counters ===================================
+def period_starts(day):
+    """``(period, period_start)`` of every top-seller bucket containing ``day``."""
+    # Freshly created sales still carry the posted ISO string
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return [
+        ("all", ALL_TIME_START),
+        ("year", day.replace(month=1, day=1)),
+        ("month", day.replace(day=1)),
+        ("week", day - timedelta(days=day.weekday())),
+    ]
+
+
+def _apply_counters(by_product):
+    """
+    Fold per-day product deltas, ``{date: {product_id: {field: delta}}}``,
+    into the top-seller counters of every period bucket they fall in.
+    """
+    buckets = {}
+    for day, products in by_product.items():
+        for bucket in period_starts(day):
+            counters = buckets.setdefault(bucket, {})
+            for product_id, values in products.items():
+                counter = counters.setdefault(product_id, {"items": 0, "revenue": 0.0})
+                counter["items"] += values["items"]
+                counter["revenue"] += values["revenue"]
+
+    for (period, period_start), deltas in buckets.items():
+        _increment_rows(
+            ProductSalesCounter,
+            {"period": period, "period_start": period_start},
+            deltas,
+            key_field="product_id",
+        )
+
+
+def record_sales(posted):
+    """Add freshly posted ``(sale, details)`` pairs to the daily rollups."""
+    _apply_sales(posted, 1)
+    invalidate_metrics(SALES)
+    logger.info(f"Daily rollups updated for {len(posted)} sale(s)")
+
+
+def unrecord_sale(sale):
+    """Remove a sale that is about to be deleted from the daily rollups."""
+    details = list(
+        sale.items.only("product_id", "quantity", "total_detail", "unit_cost")
+    )
+    _apply_sales([(sale, details)], -1)
+    invalidate_metrics(SALES)
+    logger.info(f"Sale {sale.id} removed from daily rollups on {sale.trans_date}")
+
+
+# =================================== Rebuilds ===================================
+@transaction.atomic
+def rebuild_rollups(start_date, end_date):
+    """
+    Recompute every rollup row between ``start_date`` and ``end_date``
+    (inclusive) from the stored sale totals and sale lines. The top-seller
+    counters are moved by the difference between the old and new rows.
+
+    Runs in one transaction holding a lock on the per-day rows of the range.
+    Posting a sale updates its day's row before any other rollup, so a sale
+    still being posted is waited for and included, and one posted meanwhile
+    waits for the rebuild and then adds to the rebuilt totals.
+    """
+    summaries = {
+        summary.date: summary
+        for summary in DailySalesSummary.objects.select_for_update().filter(
+            date__range=[start_date, end_date]
+        )
+    }
+    previous = _product_rows(start_date, end_date)
+    for model in REPLACED_ROLLUP_MODELS:
+        model.objects.filter(date__range=[start_date, end_date]).delete()
+
+    sales = Sale.objects.filter(trans_date__range=[start_date, end_date])
+    sale_totals = {
+        "gross_total": Sum("grand_total"),
+        "tax_total": Sum("tax_amount"),
+        "revenue": Sum(F("profit_total") + F("cogs_total")),
+        "items": Sum("item_count"),
+        "cogs_total": Sum("cogs_total"),
+        "transactions": Count("id"),
+    }
+
+    # Updated rather than replaced, so a sale waiting on the lock finds its row
+    daily = {
+        row.pop("trans_date"): row
+        for row in sales.order_by().values("trans_date").annotate(**sale_totals)
+    }
+    for day, totals in daily.items():
+        summary = summaries.setdefault(day, DailySalesSummary(date=day))
+        for field, value in totals.items():
+            setattr(summary, field, value)
+    DailySalesSummary.objects.filter(
+        date__in=[day for day in summaries if day not in daily]
+    ).delete()
+    DailySalesSummary.objects.bulk_update(
+        [summaries[day] for day in daily if summaries[day].pk],
+        list(sale_totals),
+        batch_size=1000,
+    )
+    DailySalesSummary.objects.bulk_create(
+        [summaries[day] for day in daily if not summaries[day].pk]
+    )
+
+    DailyPaymentMethodSummary.objects.bulk_create(
+        [
+            DailyPaymentMethodSummary(date=row.pop("trans_date"), **row)
+            for row in sales.order_by()
+            .values("trans_date", "payment_method")
+            .annotate(**sale_totals)
+        ]
+    )
+    DailyProductSummary.objects.bulk_create(
+        [
+            DailyProductSummary(date=row.pop("sale__trans_date"), **row)
+            for row in SaleDetail.objects.filter(
+                sale__trans_date__range=[start_date, end_date]
+            )
+            .order_by()
+            .values("sale__trans_date", "product_id")
+            .annotate(
+                revenue=Sum("total_detail"),
+                items=Sum("quantity"),
+                cogs_total=Sum(
+                    F("unit_cost") * F("quantity"), output_field=FloatField()
+                ),
+                transactions=Count("sale_id", distinct=True),
+            )
+        ],
+        batch_size=1000,
+    )
+
+    changes = {}
+    current = _product_rows(start_date, end_date)
+    for day, product_id in previous.keys() | current.keys():
+        items, revenue = current.get((day, product_id), (0, 0.0))
+        old_items, old_revenue = previous.get((day, product_id), (0, 0.0))
+        if items != old_items or revenue != old_revenue:
+            changes.setdefault(day, {})[product_id] = {
+                "items": items - old_items,
+                "revenue": revenue - old_revenue,
+            }
+    _apply_counters(changes)
+    invalidate_metrics(SALES)
+
+
+def _product_rows(start_date, end_date):
+    return {
+        (day, product_id): (items, revenue)
+        for day, product_id, items, revenue in DailyProductSummary.objects.filter(
+            date__range=[start_date, end_date]
+        ).values_list("date", "product_id", "items", "revenue")
+    }
+
+
+def rebuild_day(day):
+    """Recompute the rollups of a single day after an out-of-band edit."""
+    rebuild_rollups(day, day)
+
+
+def rebuild_top_sellers():
+    """Recompute every top-seller counter from the daily product rollups."""
+    ProductSalesCounter.objects.all().delete()
+    totals = {"items": Sum("items"), "revenue": Sum("revenue")}
+    rows = DailyProductSummary.objects.order_by()
+
+    counters = [
+        ProductSalesCounter(period="all", period_start=ALL_TIME_START, **row)
+        for row in rows.values("product_id").annotate(**totals)
+    ]
+    for period, trunc in (
+        ("year", TruncYear),
+        ("month", TruncMonth),
+        ("week", TruncWeek),
+    ):
+        counters.extend(
+            ProductSalesCounter(period=period, **row)
+            for row in rows.annotate(period_start=trunc("date"))
+            .values("period_start", "product_id")
+            .annotate(**totals)
+        )
+    ProductSalesCounter.objects.bulk_create(counters, batch_size=5000)
+    invalidate_metrics(SALES)
+    logger.info(f"Rebuilt {len(counters)} top-seller counter(s)")
+    return len(counters)
@@ -0,0 +1,34 @@
+from rest_framework import serializers
+
+from .models import PAYMENT_METHOD_CHOICES, Sale
+
+
+class SyncSaleLineSerializer(serializers.Serializer):
+    # Same shape as the POS form: "<product_id>-<volume_id>"
+    id = serializers.RegexField(r"^\d+-\d+$")
+    price = serializers.FloatField(min_value=0)
+    quantity = serializers.IntegerField(min_value=1)
+    total_product = serializers.FloatField(min_value=0)
+
+
+class SyncSaleSerializer(serializers.Serializer):
+    idempotency_key = serializers.CharField(max_length=64)
+    customer = serializers.IntegerField(required=False, allow_null=True)
+    trans_date = serializers.DateField()
+    sub_total = serializers.FloatField(default=0)
+    grand_total = serializers.FloatField(default=0)
+    tax_amount = serializers.FloatField(default=0)
+    tax_percentage = serializers.FloatField(default=0)
+    amount_payed = serializers.FloatField(default=0)
+    amount_change = serializers.FloatField(default=0)
+    payment_method = serializers.ChoiceField(
+        choices=PAYMENT_METHOD_CHOICES, default="CASH"
+    )
+    products = SyncSaleLineSerializer(many=True, allow_empty=False)
+
+    def to_sale(self):
+        """Build the unsaved Sale described by the validated data."""
+        data = dict(self.validated_data)
+        data.pop("products")
+        data["customer_id"] = data.pop("customer", None)
+        return Sale(sale_type="offline", **data)
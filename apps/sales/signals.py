@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Sale, SaleDetail
+from .rollups import rebuild_day, unrecord_sale
+
+
+@receiver(post_save, sender=SaleDetail)
+@receiver(post_delete, sender=SaleDetail)
+def refresh_sale_aggregates(sender, instance, origin=None, **kwargs):
+    # Lines removed together with their sale leave nothing to refresh
+    if isinstance(origin, Sale) or getattr(origin, "model", None) is Sale:
+        return
+    sale = Sale.objects.filter(pk=instance.sale_id).first()
+    if sale:
+        sale.refresh_aggregates()
+        rebuild_day(sale.trans_date)
+
+
+@receiver(pre_delete, sender=Sale)
+def remove_sale_from_rollups(sender, instance, **kwargs):
+    # Lines still exist at this point, so the sale can be subtracted as posted
+    unrecord_sale(instance)
+
+
+# Fields written by the posting path itself, which never move the rollups
+LINE_AGGREGATE_FIELDS = {"item_count", "cogs_total", "profit_total", "updated_at"}
+
+
+@receiver(pre_save, sender=Sale)
+def remember_stored_trans_date(sender, instance, update_fields=None, **kwargs):
+    # An edit may move the sale to another day, which must then be rebuilt too
+    instance._stored_trans_date = None
+    if instance.pk is None or (
+        update_fields and set(update_fields) <= LINE_AGGREGATE_FIELDS
+    ):
+        return
+    instance._stored_trans_date = (
+        Sale.objects.filter(pk=instance.pk).values_list("trans_date", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Sale)
+def refresh_sale_rollups(sender, instance, created, update_fields=None, **kwargs):
+    # New sales are added to the rollups by the posting path once their lines
+    # exist; anything else is an edit of a posted sale
+    if created or (update_fields and set(update_fields) <= LINE_AGGREGATE_FIELDS):
+        return
+    rebuild_day(instance.trans_date)
+    stored = getattr(instance, "_stored_trans_date", None)
+    # trans_date may still be the posted ISO string, so compare the text forms
+    if stored is not None and str(stored) != str(instance.trans_date):
+        rebuild_day(stored)
@@ -1 +1,662 @@
-# Create your tests here.
+import csv
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.http import FileResponse, StreamingHttpResponse
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from apps.authentication.models import Profile
+from apps.customers.models import Customer
+from apps.inventory.models import Inventory
+from apps.main.testing import QueryBudgetTestCase
+from apps.products.models import Product, ProductVolume, Volume
+
+from . import receipts
+from .analytics import compute_sales_analytics, get_sales_analytics
+from .models import (
+    DailyProductSummary,
+    DailySalesSummary,
+    ProductSalesCounter,
+    ReceiptSequence,
+    Sale,
+    SaleDetail,
+)
+from .receipt_numbers import ReceiptNumberAllocator
+from .rollups import period_starts, rebuild_day
+from .utils import post_sale_lines
+from .views import SALES_REPORT_EXPORT_HEADER, sales_report_rows
+
+
+# =================================== Query budgets ===================================
+class SalesQueryBudgetTests(QueryBudgetTestCase):
+    def test_sales_list(self):
+        self.check_budget("sales:sales_list", 6, self.grow_sales)
+
+    def test_sales_report(self):
+        today = date.today()
+        period = {
+            "start_date": (today - timedelta(days=30)).isoformat(),
+            "end_date": today.isoformat(),
+        }
+        self.check_budget("sales:sales_report", 9, self.grow_sales, params=period)
+
+
+# =================================== Fixtures ===================================
+class SalesTestCase(TestCase):
+    """One product with a single volume costing 4 and selling at 10."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.customer = Customer.objects.create(first_name="Walk", last_name="In")
+        cls.product = Product.objects.create(
+            name="Sold Product", description="Sold product", status="ACTIVE"
+        )
+        cls.volume = ProductVolume.objects.create(
+            product=cls.product,
+            volume=Volume.objects.create(ml=50),
+            cost=Decimal("4.00"),
+            price=Decimal("10.00"),
+        )
+        Inventory.objects.create(product=cls.product, quantity=100)
+
+    def stock(self):
+        return Inventory.objects.get(product=self.product).quantity
+
+    def post_sale(self, trans_date, quantity, volume=None):
+        volume = volume or self.volume
+        with transaction.atomic():
+            sale = Sale.objects.create(
+                customer=self.customer,
+                trans_date=trans_date,
+                sub_total=10 * quantity,
+                grand_total=10 * quantity,
+                amount_payed=10 * quantity,
+            )
+            post_sale_lines(
+                sale,
+                [
+                    {
+                        "product_id": volume.product_id,
+                        "volume_id": volume.id,
+                        "price": 10.0,
+                        "quantity": quantity,
+                        "total_detail": 10.0 * quantity,
+                    }
+                ],
+            )
+        return sale
+
+
+class SalesViewTestCase(SalesTestCase):
+    """``SalesTestCase`` with a staff user logged in to the back office."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user("clerk", password="clerk-password")
+        Profile.objects.create(user=cls.user, role="staff", bio="")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+
+# =================================== Sale posting ===================================
+class PostSaleLinesTests(SalesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Three more products costing 6 and selling at 15
+        cls.others = []
+        for n in range(3):
+            product = Product.objects.create(
+                name=f"Basket Product {n}", description="Basket", status="ACTIVE"
+            )
+            volume = ProductVolume.objects.create(
+                product=product,
+                volume=cls.volume.volume,
+                cost=Decimal("6.00"),
+                price=Decimal("15.00"),
+            )
+            Inventory.objects.create(product=product, quantity=50)
+            cls.others.append((product, volume))
+
+    def basket(self, size, quantity=1):
+        """Lines for the main product plus ``size - 1`` of the others."""
+        lines = [
+            {
+                "product_id": self.product.id,
+                "volume_id": self.volume.id,
+                "price": 10.0,
+                "quantity": 2,
+                "total_detail": 20.0,
+            }
+        ]
+        for product, volume in self.others[: size - 1]:
+            lines.append(
+                {
+                    "product_id": product.id,
+                    "volume_id": volume.id,
+                    "price": 15.0,
+                    "quantity": quantity,
+                    "total_detail": 15.0 * quantity,
+                }
+            )
+        return lines
+
+    def new_sale(self):
+        return Sale.objects.create(
+            customer=self.customer, trans_date=date(2026, 10, 18), grand_total=65
+        )
+
+    def test_basket_updates_stock_costs_totals_and_rollups(self):
+        with transaction.atomic():
+            sale = self.new_sale()
+            post_sale_lines(sale, self.basket(2, quantity=3))
+
+        other, other_volume = self.others[0]
+        self.assertEqual(self.stock(), 98)
+        self.assertEqual(Inventory.objects.get(product=other).quantity, 47)
+        self.assertEqual(
+            dict(sale.items.values_list("product_volume_id", "unit_cost")),
+            {self.volume.id: Decimal("4.00"), other_volume.id: Decimal("6.00")},
+        )
+        sale.refresh_from_db()
+        self.assertEqual(
+            (sale.item_count, sale.cogs_total, sale.profit_total), (5, 26.0, 39.0)
+        )
+
+        summary = DailySalesSummary.objects.get(date=sale.trans_date)
+        self.assertEqual(
+            (summary.items, summary.revenue, summary.cogs_total, summary.transactions),
+            (5, 65.0, 26.0, 1),
+        )
+        self.assertEqual(
+            set(
+                DailyProductSummary.objects.values_list(
+                    "product_id", "items", "revenue", "cogs_total"
+                )
+            ),
+            {(self.product.id, 2, 20.0, 8.0), (other.id, 3, 45.0, 18.0)},
+        )
+
+    def test_insufficient_stock_posts_nothing(self):
+        with self.assertRaisesMessage(ValueError, "Insufficient stock"):
+            with transaction.atomic():
+                post_sale_lines(self.new_sale(), self.basket(2, quantity=51))
+        self.assertEqual(self.stock(), 100)
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(SaleDetail.objects.exists())
+        self.assertFalse(DailySalesSummary.objects.exists())
+
+    def test_query_count_does_not_grow_with_lines(self):
+        counts = []
+        for size in (1, 4):
+            with transaction.atomic():
+                sale = self.new_sale()
+                with CaptureQueriesContext(connection) as captured:
+                    post_sale_lines(sale, self.basket(size))
+            counts.append(len(captured.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+# =================================== Rollups ===================================
+class SaleRollupTests(SalesTestCase):
+    def counter_items(self, day):
+        return {
+            period: ProductSalesCounter.objects.get(
+                period=period, period_start=start, product=self.product
+            ).items
+            for period, start in period_starts(day)
+        }
+
+    def test_moving_a_sale_rebuilds_both_days(self):
+        old_day = date(2026, 1, 15)
+        new_day = date(2026, 3, 10)
+        sale = self.post_sale(old_day, 2)
+        self.assertEqual(DailySalesSummary.objects.get(date=old_day).items, 2)
+
+        # A full save, as the admin change form does
+        sale = Sale.objects.get(pk=sale.pk)
+        sale.trans_date = new_day
+        sale.save()
+
+        self.assertFalse(DailySalesSummary.objects.filter(date=old_day).exists())
+        summary = DailySalesSummary.objects.get(date=new_day)
+        self.assertEqual((summary.items, summary.transactions), (2, 1))
+        self.assertEqual(
+            self.counter_items(old_day), {"all": 2, "year": 2, "month": 0, "week": 0}
+        )
+        self.assertEqual(
+            self.counter_items(new_day), {"all": 2, "year": 2, "month": 2, "week": 2}
+        )
+
+
+# =================================== Analytics ===================================
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class SalesAnalyticsTests(SalesTestCase):
+    today = date(2026, 10, 18)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        # Two more products costing 4 and selling at 10, like the main one
+        cls.others = []
+        for name in ("Second Product", "Third Product"):
+            product = Product.objects.create(
+                name=name, description=name, status="ACTIVE"
+            )
+            cls.others.append(
+                ProductVolume.objects.create(
+                    product=product,
+                    volume=cls.volume.volume,
+                    cost=Decimal("4.00"),
+                    price=Decimal("10.00"),
+                )
+            )
+            Inventory.objects.create(product=product, quantity=100)
+
+    def setUp(self):
+        # Revenue of 160, 30 and 10 this period; 80 for the main product before
+        self.post_sale(date(2026, 10, 1), 16)
+        self.post_sale(date(2026, 10, 2), 3, volume=self.others[0])
+        self.post_sale(date(2026, 10, 3), 1, volume=self.others[1])
+        self.post_sale(date(2026, 9, 1), 8)
+
+    def test_classes_velocity_and_period_change(self):
+        analytics = compute_sales_analytics(30, today=self.today)
+        rows = {row["product"]: row for row in analytics["rows"]}
+
+        self.assertEqual(
+            [(row["product"], row["abc_class"]) for row in analytics["rows"]],
+            [("Sold Product", "A"), ("Second Product", "B"), ("Third Product", "C")],
+        )
+        main = rows["Sold Product"]
+        self.assertEqual(
+            (main["units"], main["revenue"], main["margin"]), (16, 160, 96)
+        )
+        self.assertEqual(main["velocity"], 0.53)
+        self.assertEqual(main["margin_contribution_pct"], 80)
+        self.assertEqual((main["previous_revenue"], main["revenue_change"]), (80, 80))
+        self.assertEqual(main["revenue_change_pct"], 100)
+        # Sold nothing in the previous period, so there is no percentage
+        self.assertIsNone(rows["Second Product"]["revenue_change_pct"])
+        # 76 left after selling 24 in all, 16 of them this period
+        self.assertEqual(main["sell_through_pct"], 17.39)
+        self.assertEqual(main["days_of_cover"], 142.5)
+
+        summary = analytics["summary"]
+        self.assertEqual(
+            (summary["start_date"], summary["end_date"]),
+            (date(2026, 9, 18), date(2026, 10, 17)),
+        )
+        self.assertEqual(
+            (summary["revenue"], summary["previous_revenue"], summary["units"]),
+            (200, 80, 20),
+        )
+        self.assertEqual(summary["revenue_change_pct"], 150)
+        self.assertEqual(summary["classes"], {"A": 1, "B": 1, "C": 1})
+
+    def test_sales_today_keep_the_cached_history(self):
+        with mock.patch("apps.sales.analytics.date") as mock_date:
+            mock_date.today.return_value = self.today
+            before = get_sales_analytics()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.post_sale(self.today, 4)
+            # Only the stock is read again
+            with self.assertNumQueries(1):
+                after = get_sales_analytics()
+
+        self.assertEqual(after["summary"], before["summary"])
+        main = {row["product"]: row for row in after["rows"]}["Sold Product"]
+        self.assertEqual(main["units"], 16)
+        self.assertEqual(main["days_of_cover"], 135)
+
+    def test_rebuild_corrects_the_day_row_in_place(self):
+        day = date(2026, 10, 18)
+        self.post_sale(day, 2)
+        self.post_sale(day, 3)
+        summary = DailySalesSummary.objects.get(date=day)
+        DailySalesSummary.objects.filter(pk=summary.pk).update(items=99, revenue=0)
+
+        rebuild_day(day)
+
+        rebuilt = DailySalesSummary.objects.get(date=day)
+        # Kept, so a sale waiting on its lock still finds it
+        self.assertEqual(rebuilt.pk, summary.pk)
+        self.assertEqual(
+            (rebuilt.items, rebuilt.revenue, rebuilt.transactions), (5, 50.0, 2)
+        )
+
+
+# =================================== Report export ===================================
+class SalesReportExportTests(SalesViewTestCase):
+    period = {"start_date": "2026-10-01", "end_date": "2026-10-31"}
+
+    def setUp(self):
+        super().setUp()
+        self.sale = self.post_sale(date(2026, 10, 18), 2)
+        self.sale.receipt_number = "HQ-20261018-0001"
+        self.sale.save(update_fields=["receipt_number"])
+        # Outside the period
+        self.post_sale(date(2026, 9, 30), 1)
+
+    def export(self, file_format, params=None):
+        return self.client.get(
+            reverse("sales:sales_report_export", args=[file_format]),
+            self.period if params is None else params,
+        )
+
+    def expected_row(self):
+        return [
+            self.sale.id,
+            "HQ-20261018-0001",
+            date(2026, 10, 18),
+            "Walk In",
+            "CASH",
+            "Sold Product",
+            50,
+            10.0,
+            Decimal("4.00"),
+            2,
+            20.0,
+        ]
+
+    def test_rows_cover_the_period_only(self):
+        self.assertEqual(
+            list(sales_report_rows(date(2026, 10, 1), date(2026, 10, 31))),
+            [self.expected_row()],
+        )
+
+    def test_csv_is_streamed(self):
+        response = self.export("csv")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertEqual(
+            response["Content-Disposition"],
+            'attachment; filename="sales_report_2026-10-01_2026-10-31.csv"',
+        )
+        lines = list(
+            csv.reader(b"".join(response.streaming_content).decode().splitlines())
+        )
+        self.assertEqual(lines[0], SALES_REPORT_EXPORT_HEADER)
+        self.assertEqual(lines[1:], [[str(value) for value in self.expected_row()]])
+
+    def test_xlsx_is_a_file_response(self):
+        response = self.export("xlsx")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(
+            response["Content-Type"],
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
+        self.assertIn(
+            'filename="sales_report_2026-10-01_2026-10-31.xlsx"',
+            response["Content-Disposition"],
+        )
+        sheet = load_workbook(BytesIO(b"".join(response.streaming_content))).active
+        header, row = sheet.iter_rows(values_only=True)
+        self.assertEqual(list(header), SALES_REPORT_EXPORT_HEADER)
+        # Dates come back as datetimes and numbers as plain numbers
+        self.assertEqual(row[2].date(), date(2026, 10, 18))
+        self.assertEqual(
+            row[:2] + row[3:],
+            (self.sale.id, "HQ-20261018-0001", "Walk In", "CASH", "Sold Product")
+            + (50, 10, 4, 2, 20),
+        )
+
+    def test_invalid_format_or_period_redirects_to_the_report(self):
+        for file_format, params in (
+            ("pdf", self.period),
+            ("csv", {"start_date": "2026-10-31", "end_date": "2026-10-01"}),
+            ("xlsx", {"start_date": "not a date", "end_date": "2026-10-01"}),
+            ("csv", {}),
+        ):
+            with self.subTest(file_format=file_format, params=params):
+                response = self.export(file_format, params)
+                self.assertRedirects(
+                    response,
+                    reverse("sales:sales_report"),
+                    fetch_redirect_response=False,
+                )
+
+
+# =================================== Aggregate backfill ===================================
+class BackfillSaleAggregatesTests(SalesTestCase):
+    def test_aggregates_are_rebuilt_from_the_lines(self):
+        sales = [
+            self.post_sale(date(2026, 10, 17), 2),
+            self.post_sale(date(2026, 10, 18), 3),
+        ]
+        # Sales posted before the columns existed, and one whose lines are gone
+        Sale.objects.update(item_count=0, cogs_total=0, profit_total=0)
+        empty = Sale.objects.create(
+            customer=self.customer,
+            trans_date=date(2026, 10, 18),
+            item_count=7,
+            cogs_total=28,
+            profit_total=42,
+        )
+
+        output = StringIO()
+        call_command("backfill_sale_aggregates", chunk_size=2, stdout=output)
+
+        self.assertEqual(
+            {
+                sale_id: (item_count, cogs_total, profit_total)
+                for sale_id, item_count, cogs_total, profit_total in (
+                    Sale.objects.values_list(
+                        "id", "item_count", "cogs_total", "profit_total"
+                    )
+                )
+            },
+            {
+                sales[0].id: (2, 8.0, 12.0),
+                sales[1].id: (3, 12.0, 18.0),
+                empty.id: (0, 0.0, 0.0),
+            },
+        )
+        self.assertIn("Backfilled 3 sales.", output.getvalue())
+
+
+# =================================== Offline sync ===================================
+class SalesSyncTests(SalesTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.user = User.objects.create_user("till", password="till-password")
+        Profile.objects.create(user=cls.user, role="staff", bio="")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def sale_data(self, key, quantity):
+        return {
+            "idempotency_key": key,
+            "customer": self.customer.id,
+            "trans_date": "2026-10-18",
+            "sub_total": 10 * quantity,
+            "grand_total": 10 * quantity,
+            "amount_payed": 10 * quantity,
+            "products": [
+                {
+                    "id": f"{self.product.id}-{self.volume.id}",
+                    "price": 10,
+                    "quantity": quantity,
+                    "total_product": 10 * quantity,
+                }
+            ],
+        }
+
+    def sync(self, *sales):
+        response = self.client.post(
+            reverse("sales:sales_sync"), {"sales": list(sales)}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_resubmitted_batch_is_not_posted_again(self):
+        batch = [self.sale_data("till-1", 2), self.sale_data("till-2", 3)]
+        first = self.sync(*batch)
+        self.assertEqual([r["status"] for r in first], ["created", "created"])
+        sales = {sale.idempotency_key: sale for sale in Sale.objects.all()}
+        self.assertEqual(
+            first,
+            [
+                {
+                    "idempotency_key": key,
+                    "status": "created",
+                    "sale_id": sales[key].id,
+                    "error": None,
+                }
+                for key in ("till-1", "till-2")
+            ],
+        )
+        self.assertTrue(all(sale.receipt_number for sale in sales.values()))
+        self.assertEqual(self.stock(), 95)
+
+        second = self.sync(*batch)
+        self.assertEqual(
+            [(r["status"], r["sale_id"]) for r in second],
+            [("duplicate", sales["till-1"].id), ("duplicate", sales["till-2"].id)],
+        )
+        self.assertEqual(Sale.objects.count(), 2)
+        self.assertEqual(SaleDetail.objects.count(), 2)
+        self.assertEqual(self.stock(), 95)
+        self.assertEqual(DailySalesSummary.objects.get().items, 5)
+
+    def test_key_repeated_within_a_batch_is_posted_once(self):
+        results = self.sync(self.sale_data("till-1", 2), self.sale_data("till-1", 2))
+        self.assertEqual([r["status"] for r in results], ["created", "duplicate"])
+        self.assertEqual(results[0]["sale_id"], results[1]["sale_id"])
+        self.assertEqual(self.stock(), 98)
+
+    def test_rejected_entries_do_not_block_the_rest(self):
+        invalid = self.sale_data("till-3", 1)
+        del invalid["products"]
+        results = self.sync(
+            self.sale_data("till-1", 2),
+            self.sale_data("till-2", 500),
+            invalid,
+            self.sale_data("till-4", 1),
+        )
+        self.assertEqual(
+            [r["status"] for r in results],
+            ["created", "rejected", "invalid", "created"],
+        )
+        self.assertIn("Insufficient stock", results[1]["error"])
+        self.assertIsNone(results[1]["sale_id"])
+        self.assertIn("products", results[2]["error"])
+        self.assertEqual(
+            set(Sale.objects.values_list("idempotency_key", flat=True)),
+            {"till-1", "till-4"},
+        )
+        self.assertEqual(self.stock(), 97)
+
+
+# =================================== Receipt numbers ===================================
+# Blocks are only cached outside a transaction, which TestCase always opens
+class ReceiptNumberAllocatorTests(TransactionTestCase):
+    day = date(2026, 10, 18)
+
+    def test_numbers_are_unique_across_blocks_and_workers(self):
+        first, second = ReceiptNumberAllocator(3), ReceiptNumberAllocator(3)
+        numbers = first.allocate(self.day, 2) + second.allocate(self.day, 2)
+        numbers += first.allocate(self.day, 2) + second.allocate(self.day, 1)
+        self.assertEqual(
+            [number.rsplit("-", 1)[1] for number in numbers],
+            ["000001", "000002", "000004", "000005", "000003", "000007", "000006"],
+        )
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertEqual(ReceiptSequence.objects.get().next_number, 10)
+
+    def test_each_day_has_its_own_sequence(self):
+        allocator = ReceiptNumberAllocator(5)
+        next_day = self.day + timedelta(days=1)
+        self.assertEqual(allocator.allocate(self.day, 1, "HQ"), ["HQ-20261018-000001"])
+        self.assertEqual(allocator.allocate(next_day, 1, "HQ"), ["HQ-20261019-000001"])
+        # Reserving the new day's block forgot the previous day
+        self.assertEqual(list(allocator._blocks), [("HQ", next_day)])
+        self.assertEqual(allocator.allocate(self.day, 1, "HQ"), ["HQ-20261018-000006"])
+
+
+# =================================== Receipts ===================================
+class ReceiptPdfTests(SalesViewTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(RECEIPTS_DIR=directory.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.storage = receipts.get_receipt_storage()
+
+    def get_receipt(self, sale_id, **headers):
+        return self.client.get(
+            reverse("sales:sales_receipt_pdf", args=[sale_id]), headers=headers
+        )
+
+    def test_receipt_is_rendered_once_and_served_inline(self):
+        sale = self.post_sale(date(2026, 10, 18), 1)
+        response = self.get_receipt(sale.id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(
+            response["Content-Disposition"], 'inline; filename="receipt.pdf"'
+        )
+        self.assertTrue(b"".join(response.streaming_content).startswith(b"%PDF"))
+        _, digest = receipts.render_receipt_html(Sale.objects.get(pk=sale.pk))
+        self.assertEqual(response["ETag"], f'"{sale.id}-{digest}"')
+        self.assertEqual(self.storage.listdir(str(sale.id))[1], [f"{digest}.pdf"])
+
+        # The stored file is served again without converting anything
+        with mock.patch.object(receipts.pisa, "CreatePDF") as create_pdf:
+            self.assertEqual(self.get_receipt(sale.id).status_code, 200)
+        create_pdf.assert_not_called()
+
+    def test_matching_etag_is_not_modified(self):
+        sale = self.post_sale(date(2026, 10, 18), 1)
+        etag = self.get_receipt(sale.id)["ETag"]
+
+        response = self.get_receipt(sale.id, if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        # A changed sale renders different HTML, so the old ETag is stale
+        sale.amount_payed = 50
+        sale.save(update_fields=["amount_payed"])
+        response = self.get_receipt(sale.id, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_unknown_sale_is_not_found(self):
+        self.assertEqual(self.get_receipt(404).status_code, 404)
+
+    def test_new_version_replaces_only_the_sales_own_receipts(self):
+        sale = self.post_sale(date(2026, 10, 18), 1)
+        other = self.post_sale(date(2026, 10, 18), 1)
+        receipts.ensure_receipt_pdf(other, "<p>Other</p>", "other")
+        self.assertEqual(
+            receipts.ensure_receipt_pdf(sale, "<p>First</p>", "first"),
+            f"{sale.id}/first.pdf",
+        )
+        receipts.ensure_receipt_pdf(sale, "<p>Second</p>", "second")
+
+        self.assertEqual(self.storage.listdir(str(sale.id))[1], ["second.pdf"])
+        self.assertEqual(self.storage.listdir(str(other.id))[1], ["other.pdf"])
@@ -1,6 +1,7 @@
 from django.urls import path
 
 from . import views
+from .viewset import SalesSyncView
 
 app_name = "sales"
 
@@ -8,8 +9,16 @@ app_name = "sales"
 urlpatterns = [
     path("", views.sales_list_view, name="sales_list"),
     path("sales-report/", views.sales_report_view, name="sales_report"),
+    path(
+        "sales-report/export/<str:file_format>/",
+        views.sales_report_export_view,
+        name="sales_report_export",
+    ),
+    path("analytics/", views.sales_analytics_view, name="sales_analytics"),
     path("add", views.sales_add_view, name="sales_add"),
     path("details/<str:sale_id>", views.sales_details_view, name="sales_details"),
     path("sale/delete/<int:sale_id>/", views.sale_delete_view, name="delete_sale"),
     path("pdf/<str:sale_id>", views.receipt_pdf_view, name="sales_receipt_pdf"),
+    # Offline POS sync
+    path("api/sync/", SalesSyncView.as_view(), name="sales_sync"),
 ]
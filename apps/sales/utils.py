@@ -0,0 +1,250 @@
+import logging
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import Case, When, F, Value, BooleanField, IntegerField
+from apps.customers.models import Customer
+from apps.inventory.models import Inventory
+from apps.main.metrics import CATALOG, invalidate_metrics
+from apps.products.cards import sync_card_stock
+from apps.products.models import Product, ProductVolume
+from .models import Sale, SaleDetail
+from .rollups import record_sales
+
+logger = logging.getLogger(__name__)
+
+
+# =================================== Sale line posting ===================================
+def parse_sale_lines(products_data):
+    """Turn the JSON ``products`` entries posted by the POS form into sale lines."""
+    lines = []
+    for product_data in products_data:
+        # Combined "<product_id>-<volume_id>" identifier
+        product_id, volume_id = map(int, product_data["id"].split("-"))
+        lines.append(
+            {
+                "product_id": product_id,
+                "volume_id": volume_id,
+                "price": float(product_data["price"]),
+                "quantity": int(product_data["quantity"]),
+                "total_detail": float(product_data["total_product"]),
+            }
+        )
+    return lines
+
+
+def _load_stock(lines):
+    """Load the products, volumes and locked inventory rows ``lines`` refer to."""
+    product_ids = {line["product_id"] for line in lines}
+    volume_ids = {line["volume_id"] for line in lines}
+
+    products = Product.objects.in_bulk(product_ids)
+    volumes = ProductVolume.objects.in_bulk(volume_ids)
+    inventories = {
+        inventory.product_id: inventory
+        for inventory in Inventory.objects.select_for_update().filter(
+            product_id__in=product_ids
+        )
+    }
+    return products, volumes, inventories
+
+
+def _requested_quantities(lines, products, volumes):
+    """Validate ``lines`` and return the quantity requested per product."""
+    requested = {}
+    for line in lines:
+        product = products.get(line["product_id"])
+        if product is None:
+            raise Product.DoesNotExist(f"Product {line['product_id']} does not exist.")
+        volume = volumes.get(line["volume_id"])
+        if volume is None or volume.product_id != product.id:
+            raise ProductVolume.DoesNotExist(
+                f"Volume {line['volume_id']} does not exist for {product.name}."
+            )
+        requested[product.id] = requested.get(product.id, 0) + line["quantity"]
+    return requested
+
+
+def _reserve_stock(requested, products, inventories):
+    """
+    Check ``requested`` against the in-memory inventory rows and decrement
+    them. Nothing is decremented unless every product has enough stock.
+    """
+    for product_id, quantity in requested.items():
+        inventory = inventories.get(product_id)
+        if inventory is None or inventory.quantity < quantity:
+            raise ValueError(
+                f"Oops! Insufficient stock for {products[product_id].name}"
+            )
+
+    for product_id, quantity in requested.items():
+        inventory = inventories[product_id]
+        inventory.product = products[product_id]
+        inventory.quantity -= quantity
+        inventory.check_stock_alerts()
+
+
+def _write_stock(requested, inventories):
+    """Apply every reserved decrement in a single statement."""
+    Inventory.objects.filter(product_id__in=requested).update(
+        quantity=Case(
+            *[
+                When(product_id=product_id, then=F("quantity") - quantity)
+                for product_id, quantity in requested.items()
+            ],
+            default=F("quantity"),
+            output_field=IntegerField(),
+        ),
+        is_out_of_stock=Case(
+            *[
+                When(
+                    product_id=product_id,
+                    then=Value(inventories[product_id].is_out_of_stock),
+                )
+                for product_id in requested
+            ],
+            default=F("is_out_of_stock"),
+            output_field=BooleanField(),
+        ),
+    )
+    sync_card_stock(requested)
+    invalidate_metrics(CATALOG)
+
+
+def _build_details(sale, lines, products, volumes):
+    return [
+        SaleDetail(
+            sale=sale,
+            product=products[line["product_id"]],
+            product_volume=volumes[line["volume_id"]],
+            price=line["price"],
+            unit_cost=volumes[line["volume_id"]].cost,
+            quantity=line["quantity"],
+            total_detail=line["total_detail"],
+        )
+        for line in lines
+    ]
+
+
+def _fill_line_totals(sale, lines, volumes):
+    """Store the line aggregates on the sale itself."""
+    sale.item_count = sum(line["quantity"] for line in lines)
+    sale.cogs_total = sum(
+        float(volumes[line["volume_id"]].cost) * line["quantity"] for line in lines
+    )
+    sale.profit_total = sum(line["total_detail"] for line in lines) - sale.cogs_total
+
+
+def post_sale_lines(sale, lines):
+    """
+    Post all lines of a sale with a fixed number of queries.
+
+    Products, volumes and inventory rows are loaded in one query each, stock is
+    checked in memory, every decrement is applied in a single UPDATE and the
+    SaleDetail rows are bulk inserted. Must run inside ``transaction.atomic()``.
+    Raises ValueError when a product does not have enough stock.
+    """
+    products, volumes, inventories = _load_stock(lines)
+    requested = _requested_quantities(lines, products, volumes)
+    _reserve_stock(requested, products, inventories)
+
+    _write_stock(requested, inventories)
+    logger.info(f"Stock updated for {len(requested)} product(s) on sale {sale.id}")
+
+    details = SaleDetail.objects.bulk_create(
+        _build_details(sale, lines, products, volumes)
+    )
+    logger.info(f"{len(details)} sale detail(s) added to sale {sale.id}")
+
+    _fill_line_totals(sale, lines, volumes)
+    sale.save(update_fields=["item_count", "cogs_total", "profit_total", "updated_at"])
+
+    record_sales([(sale, details)])
+    return details
+
+
+# =================================== Batch sale posting ===================================
+def post_sales_batch(entries):
+    """
+    Post a batch of ``(sale, lines)`` pairs, where each sale is an unsaved
+    Sale carrying its ``idempotency_key``.
+
+    Keys that were already posted, or that repeat within the batch, are
+    skipped. A sale with an unknown customer, product or volume, or without
+    enough stock, is rejected on its own without failing the rest of the
+    batch. Accepted sales, their lines and the inventory decrements are
+    written with one bulk insert or UPDATE each. Must run inside
+    ``transaction.atomic()``.
+
+    Returns one dict per entry, in order, with ``idempotency_key``,
+    ``status`` ("created", "duplicate" or "rejected"), ``sale_id`` and
+    ``error``.
+    """
+    existing = dict(
+        Sale.objects.filter(
+            idempotency_key__in=[sale.idempotency_key for sale, _ in entries]
+        ).values_list("idempotency_key", "id")
+    )
+    customers = Customer.objects.in_bulk(
+        {sale.customer_id for sale, _ in entries if sale.customer_id is not None}
+    )
+    products, volumes, inventories = _load_stock(
+        [line for _, lines in entries for line in lines]
+    )
+
+    # (key, status, existing sale id or Sale instance, error) per entry
+    outcomes = []
+    accepted = {}
+    requested_total = {}
+    for sale, lines in entries:
+        key = sale.idempotency_key
+        if key in existing or key in accepted:
+            outcomes.append(
+                (key, "duplicate", existing.get(key) or accepted[key], None)
+            )
+            continue
+
+        try:
+            if not lines:
+                raise ValueError("Sale has no lines.")
+            if sale.customer_id is not None and sale.customer_id not in customers:
+                raise Customer.DoesNotExist(
+                    f"Customer {sale.customer_id} does not exist."
+                )
+            requested = _requested_quantities(lines, products, volumes)
+            _reserve_stock(requested, products, inventories)
+        except (ValueError, ObjectDoesNotExist) as e:
+            outcomes.append((key, "rejected", None, str(e)))
+            continue
+
+        for product_id, quantity in requested.items():
+            requested_total[product_id] = requested_total.get(product_id, 0) + quantity
+        _fill_line_totals(sale, lines, volumes)
+        accepted[key] = sale
+        outcomes.append((key, "created", sale, None))
+
+    if accepted:
+        _write_stock(requested_total, inventories)
+        Sale.objects.bulk_create(accepted.values())
+
+        posted = [
+            (sale, _build_details(sale, lines, products, volumes))
+            for sale, lines in entries
+            if accepted.get(sale.idempotency_key) is sale
+        ]
+        SaleDetail.objects.bulk_create(
+            [detail for _, details in posted for detail in details]
+        )
+        record_sales(posted)
+        logger.info(
+            f"Batch posted {len(accepted)} sale(s) touching "
+            f"{len(requested_total)} product(s)"
+        )
+
+    return [
+        {
+            "idempotency_key": key,
+            "status": status,
+            "sale_id": getattr(sale, "id", sale),
+            "error": error,
+        }
+        for key, status, sale, error in outcomes
+    ]
@@ -1,25 +1,48 @@
+import csv
+import itertools
 import json
 import logging
+import tempfile
 from collections import defaultdict
 from django.core.paginator import Paginator
-from django.db.models import Q
 from django.db.models import Sum, Count
 from datetime import datetime, timedelta
 from django.db import transaction
 from django.db.models import Prefetch
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse
+from django.http import (
+    FileResponse,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils.http import parse_etags
 from django.shortcuts import render, redirect, get_object_or_404
 from core.wsgi import *
-from xhtml2pdf import pisa
-from django.template.loader import get_template
+from openpyxl import Workbook
 from django.db.models import Sum, Count
 from apps.customers.models import Customer
+from apps.main.search import build_search_filter
 from apps.inventory.models import Inventory
-from apps.products.models import Product, ProductVolume
-from .models import Sale, SaleDetail
+from apps.products.models import Product
+from .models import (
+    PAYMENT_METHOD_CHOICES,
+    DailyPaymentMethodSummary,
+    DailySalesSummary,
+    Sale,
+    SaleDetail,
+)
+from .analytics import ANALYTICS_PERIODS, get_sales_analytics
 from .forms import ReportPeriodForm
+from .receipts import (
+    ensure_receipt_pdf,
+    get_receipt_storage,
+    render_receipt_html,
+    schedule_receipt,
+)
+from .receipt_numbers import allocate_receipt_number
+from .utils import parse_sale_lines, post_sale_lines
 
 
 # Import custom decorators
@@ -38,37 +61,35 @@ def sales_list_view(request):
     # Get the search term from the GET request
     search_query = request.GET.get("search", "")
 
-    # Filter sales based on search term (e.g., customer name or sale ID)
-    if search_query:
-        sales = (
-            Sale.objects.filter(
-                Q(customer__first_name__icontains=search_query)
-                | Q(customer__last_name__icontains=search_query)
-                | Q(id__icontains=search_query)
-            )
-            .select_related("customer")
-            .prefetch_related("items__product__productvolume_set__volume")
-            .order_by("id")
+    sales = (
+        Sale.objects.select_related("customer")
+        .prefetch_related(
+            Prefetch("items", queryset=SaleDetail.objects.select_related("product"))
         )
-    else:
-        sales = (
-            Sale.objects.all()
-            .select_related("customer")
-            .prefetch_related("items__product__productvolume_set__volume")
-            .order_by("id")
+        .order_by("id")
+    )
+
+    # Filter sales based on search term (customer name, sale ID or receipt number)
+    if search_query:
+        sales = sales.filter(
+            build_search_filter(search_query, receipt_field="receipt_number")
         )
 
-    # Paginate the sales (10 sales per page)
+    # Footer totals and row count come from a single aggregate over stored columns
+    totals = sales.aggregate(
+        sale_count=Count("id"),
+        grand_total=Sum("grand_total"),
+        total_items=Sum("item_count"),
+    )
+    grand_total = totals["grand_total"] or 0
+    total_items = totals["total_items"] or 0
+
+    # Paginate the sales (10 sales per page); the prefetch only runs for that page
     paginator = Paginator(sales, 10)
+    paginator.count = totals["sale_count"]
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
-    # Calculate grand total and total items
-    grand_total = sales.aggregate(Sum("grand_total"))["grand_total__sum"] or 0
-    total_items = sum(
-        sale.sum_items() for sale in sales
-    )  # Assuming sum_items() method is defined
-
     # Context with paginated sales and other variables
     context = {
         "table_title": "sales",
@@ -94,25 +115,38 @@ def sales_report_view(request):
         start_date = form.cleaned_data["start_date"]
         end_date = form.cleaned_data["end_date"]
 
-    # Filter sales by date range and prefetch related data
-    sales = Sale.objects.filter(
-        trans_date__range=[start_date, end_date]
-    ).prefetch_related("items__product_volume", "items__product")
-
-    # Aggregate totals
-    total_sales = sales.aggregate(
-        total_revenue=Sum("items__total_detail"),  # Calculate directly from items
-        total_items_sold=Sum("items__quantity"),
-        total_transactions=Count("id"),
+    # Filter sales by date range and prefetch the lines shown in the table
+    sales = (
+        Sale.objects.filter(trans_date__range=[start_date, end_date])
+        .select_related("customer")
+        .prefetch_related(
+            Prefetch(
+                "items",
+                queryset=SaleDetail.objects.select_related(
+                    "product", "product_volume__volume"
+                ),
+            )
+        )
     )
 
-    # Calculate COGS
-    cogs = 0
-    for sale in sales:
-        for item in sale.items.all():
-            product_volume = item.product_volume
-            if product_volume:
-                cogs += product_volume.cost * item.quantity
+    # Revenue, items, transactions and COGS from the daily rollups
+    total_sales = DailySalesSummary.objects.filter(
+        date__range=[start_date, end_date]
+    ).aggregate(
+        total_revenue=Sum("revenue"),
+        total_items_sold=Sum("items"),
+        total_transactions=Sum("transactions"),
+        total_cogs=Sum("cogs_total"),
+    )
+    payment_breakdown = (
+        DailyPaymentMethodSummary.objects.filter(date__range=[start_date, end_date])
+        .values("payment_method")
+        .annotate(gross_total=Sum("gross_total"), transactions=Sum("transactions"))
+        .order_by("-gross_total")
+    )
+    payment_methods = dict(PAYMENT_METHOD_CHOICES)
+    cogs = total_sales["total_cogs"] or 0
+    total_profit_after_sales = (total_sales["total_revenue"] or 0) - cogs
 
     # Calculate stock balance
     stock_balance = (
@@ -121,33 +155,19 @@ def sales_report_view(request):
 
     # Prepare detailed sales data
     sale_details = []
-    total_profit_after_sales = 0
-
     for sale in sales:
-        sale_profit = 0
-        item_details = []
-
-        for item in sale.items.all():
-            product = item.product
-            product_volume = item.product_volume
-
-            if product_volume:
-                item_profit = (
-                    product_volume.price - product_volume.cost
-                ) * item.quantity
-                sale_profit += item_profit
-                total_profit_after_sales += item_profit
-
-                item_details.append(
-                    {
-                        "product": product.name,
-                        "volume": product_volume.volume.ml,
-                        "price": product_volume.price,
-                        "cost": product_volume.cost,
-                        "quantity": item.quantity,
-                        "total": item.total_detail,
-                    }
-                )
+        item_details = [
+            {
+                "product": item.product.name,
+                "volume": item.volume_ml(),
+                "price": item.price,
+                "cost": item.unit_cost,
+                "quantity": item.quantity,
+                "total": item.total_detail,
+            }
+            for item in sale.items.all()
+            if item.product_volume
+        ]
 
         sale_details.append(
             {
@@ -158,7 +178,7 @@ def sales_report_view(request):
                     else "N/A"
                 ),
                 "grand_total": sale.grand_total,
-                "profit": sale_profit,
+                "profit": sale.profit_total,
                 "payment_method": sale.payment_method,
                 "item_details": item_details,
             }
@@ -169,9 +189,13 @@ def sales_report_view(request):
         "start_date": start_date,
         "end_date": end_date,
         "total_revenue": total_sales["total_revenue"],
-        "total_items_sold": total_sales["total_items_sold"],
-        "total_transactions": total_sales["total_transactions"],
+        "total_items_sold": total_sales["total_items_sold"] or 0,
+        "total_transactions": total_sales["total_transactions"] or 0,
         "total_cogs": cogs,
+        "payment_breakdown": [
+            {**row, "label": payment_methods.get(row["payment_method"])}
+            for row in payment_breakdown
+        ],
         "sales": sale_details,
         "stock_balance": stock_balance,
         "total_profit_after_sales": total_profit_after_sales,
@@ -181,6 +205,133 @@ def sales_report_view(request):
     return render(request, "sales/sales_report.html", context)
 
 
+# =================================== sales analytics view ===================================
+@login_required
+@admin_or_manager_or_staff_required
+def sales_analytics_view(request):
+    try:
+        days = int(request.GET.get("days", ANALYTICS_PERIODS[0]))
+    except ValueError:
+        days = ANALYTICS_PERIODS[0]
+    if days not in ANALYTICS_PERIODS:
+        days = ANALYTICS_PERIODS[0]
+
+    analytics = get_sales_analytics(days)
+
+    context = {
+        "summary": analytics["summary"],
+        "rows": analytics["rows"],
+        "days": days,
+        "periods": ANALYTICS_PERIODS,
+        "table_title": "Sales Analytics",
+    }
+    return render(request, "sales/sales_analytics.html", context)
+
+
+# =================================== sales report export view ===================================
+SALES_REPORT_EXPORT_HEADER = [
+    "Sale ID",
+    "Receipt Number",
+    "Sale Date",
+    "Customer",
+    "Payment Method",
+    "Product",
+    "Volume (ML)",
+    "Price",
+    "Cost",
+    "Quantity",
+    "Line Total",
+]
+
+
+def sales_report_rows(start_date, end_date):
+    """Yield one export row per sale line, read from the database in chunks."""
+    details = (
+        SaleDetail.objects.filter(sale__trans_date__range=[start_date, end_date])
+        .order_by("sale__trans_date", "sale_id", "id")
+        .values_list(
+            "sale_id",
+            "sale__receipt_number",
+            "sale__trans_date",
+            "sale__customer__first_name",
+            "sale__customer__last_name",
+            "sale__payment_method",
+            "product__name",
+            "product_volume__volume__ml",
+            "price",
+            "unit_cost",
+            "quantity",
+            "total_detail",
+        )
+    )
+    for (
+        sale_id,
+        receipt_number,
+        trans_date,
+        first_name,
+        last_name,
+        payment_method,
+        *line,
+    ) in details.iterator(chunk_size=2000):
+        customer = f"{first_name or ''} {last_name or ''}".strip() or "N/A"
+        yield [sale_id, receipt_number, trans_date, customer, payment_method, *line]
+
+
+class Echo:
+    """Pseudo-buffer handing each written CSV line straight back to the caller."""
+
+    def write(self, value):
+        return value
+
+
+@admin_or_manager_or_staff_required
+@login_required
+def sales_report_export_view(request, file_format):
+    form = ReportPeriodForm(request.GET)
+    if file_format not in ("csv", "xlsx") or not form.is_valid():
+        messages.error(
+            request,
+            "Select a valid report period to export.",
+            extra_tags="bg-danger",
+        )
+        return redirect("sales:sales_report")
+
+    start_date = form.cleaned_data["start_date"]
+    end_date = form.cleaned_data["end_date"]
+    filename = f"sales_report_{start_date}_{end_date}.{file_format}"
+    rows = sales_report_rows(start_date, end_date)
+
+    if file_format == "csv":
+        # Stream the CSV as the rows come out of the database
+        writer = csv.writer(Echo())
+        response = StreamingHttpResponse(
+            (
+                writer.writerow(row)
+                for row in itertools.chain([SALES_REPORT_EXPORT_HEADER], rows)
+            ),
+            content_type="text/csv",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    # Write-only workbooks flush each row to disk instead of keeping it in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sales Report")
+    sheet.append(SALES_REPORT_EXPORT_HEADER)
+    for row in rows:
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=filename,
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+
 # =================================== Sale Add view ===================================
 @admin_or_manager_or_staff_required
 @login_required
@@ -219,50 +370,25 @@ def sales_add_view(request):
                 "amount_change": float(request.POST.get("amount_change", 0)),
             }
 
+            # Reserved outside the transaction so the worker's block stays cached
+            sale_attributes["receipt_number"] = allocate_receipt_number(
+                sale_attributes["trans_date"]
+            )
+
             with transaction.atomic():
                 # Create the sale
                 new_sale = Sale.objects.create(**sale_attributes)
                 logger.info(f"Sale created successfully: {sale_attributes}")
 
-                # Extract product details from form data
-                products_data = request.POST.getlist("products")
-                for product_data_str in products_data:
-                    product_data = json.loads(product_data_str)
-
-                    # Parse combined product and volume IDs
-                    product_id, volume_id = map(int, product_data["id"].split("-"))
-                    product_obj = Product.objects.get(id=product_id)
-                    product_volume = ProductVolume.objects.get(id=volume_id)
-                    quantity_requested = int(product_data["quantity"])
-
-                    # Check if the product's inventory has sufficient stock
-                    if (
-                        not hasattr(product_obj, "inventory")
-                        or product_obj.inventory.quantity < quantity_requested
-                    ):
-                        raise ValueError(
-                            f"Oops! Insufficient stock for {product_obj.name}"
-                        )
-
-                    # Update inventory stock at the product level
-                    inventory_obj = product_obj.inventory
-                    inventory_obj.quantity -= quantity_requested
-                    inventory_obj.save()
-                    logger.info(
-                        f"Stock updated for {product_obj.name}: {inventory_obj.quantity}"
-                    )
-
-                    # Create sale detail
-                    detail_attributes = {
-                        "sale": new_sale,
-                        "product": product_obj,
-                        "product_volume": product_volume,  # Include product volume
-                        "price": float(product_data["price"]),
-                        "quantity": quantity_requested,
-                        "total_detail": float(product_data["total_product"]),
-                    }
-                    SaleDetail.objects.create(**detail_attributes)
-                    logger.info(f"Sale detail added: {detail_attributes}")
+                # Post every cart line with a constant number of queries
+                lines = parse_sale_lines(
+                    json.loads(product_data_str)
+                    for product_data_str in request.POST.getlist("products")
+                )
+                post_sale_lines(new_sale, lines)
+
+                # Pre-render the receipt once the sale has committed
+                schedule_receipt(new_sale)
 
                 # Success message
                 messages.success(
@@ -339,26 +465,24 @@ def sale_delete_view(request, sale_id):
 @login_required
 @admin_or_manager_or_staff_required
 def receipt_pdf_view(request, sale_id):
-    # Get the sale
-    sale = Sale.objects.get(id=sale_id)
-
-    # Get the sale details
-    details = SaleDetail.objects.filter(sale=sale)
-
-    # Render the template
-    template = get_template("sales/sales_receipt_pdf.html")
-    context = {"sale": sale, "details": details}
-    html_template = template.render(context)
-
-    # Create a file-like buffer to receive PDF data
-    response = HttpResponse(content_type="application/pdf")
-    response["Content-Disposition"] = 'inline; filename="receipt.pdf"'
-
-    # Convert HTML to PDF
-    pisa_status = pisa.CreatePDF(html_template, dest=response)
-
-    # Check if PDF was created successfully
-    if pisa_status.err:
+    sale = get_object_or_404(Sale.objects.select_related("customer"), id=sale_id)
+
+    # The rendered HTML is cheap; its hash identifies the cached PDF
+    html_template, digest = render_receipt_html(sale)
+    etag = f'"{sale.id}-{digest}"'
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+
+    # Convert HTML to PDF only when this version has not been rendered yet
+    name = ensure_receipt_pdf(sale, html_template, digest)
+    if name is None:
         return HttpResponse("Error generating PDF", status=500)
 
+    response = FileResponse(
+        get_receipt_storage().open(name, "rb"), content_type="application/pdf"
+    )
+    response["Content-Disposition"] = 'inline; filename="receipt.pdf"'
+    response["ETag"] = etag
     return response
@@ -0,0 +1,96 @@
+import logging
+
+from django.db import IntegrityError, transaction
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.authentication.permissions import IsAdminOrManagerOrStaff
+from .receipt_numbers import allocate_receipt_numbers
+from .receipts import schedule_receipt
+from .serializers import SyncSaleSerializer
+from .utils import parse_sale_lines, post_sales_batch
+
+logger = logging.getLogger(__name__)
+
+# Largest number of queued sales accepted in one request
+SYNC_BATCH_LIMIT = 200
+
+
+class SalesSyncView(APIView):
+    """
+    Accept a batch of sales queued by an offline till.
+
+    Each sale carries a client-generated ``idempotency_key``; resubmitting a
+    key returns the sale that was already posted instead of a duplicate. The
+    response lists one result per submitted sale, in order.
+    """
+
+    permission_classes = (IsAuthenticated, IsAdminOrManagerOrStaff)
+
+    def post(self, request):
+        sales_data = request.data.get("sales")
+        if not isinstance(sales_data, list) or not sales_data:
+            return Response(
+                {"detail": "Expected a non-empty list of sales."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(sales_data) > SYNC_BATCH_LIMIT:
+            return Response(
+                {"detail": f"At most {SYNC_BATCH_LIMIT} sales per batch."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Validate every sale on its own so one bad entry does not block the queue
+        results = [None] * len(sales_data)
+        entries, positions = [], []
+        for index, sale_data in enumerate(sales_data):
+            serializer = SyncSaleSerializer(data=sale_data)
+            if not serializer.is_valid():
+                results[index] = {
+                    "idempotency_key": (
+                        sale_data.get("idempotency_key")
+                        if isinstance(sale_data, dict)
+                        else None
+                    ),
+                    "status": "invalid",
+                    "sale_id": None,
+                    "error": serializer.errors,
+                }
+                continue
+            entries.append(
+                (
+                    serializer.to_sale(),
+                    parse_sale_lines(serializer.validated_data["products"]),
+                )
+            )
+            positions.append(index)
+
+        if entries:
+            # Number every valid sale up front, outside the posting transaction
+            by_date = {}
+            for sale, _ in entries:
+                by_date.setdefault(sale.trans_date, []).append(sale)
+            for trans_date, sales in by_date.items():
+                numbers = allocate_receipt_numbers(trans_date, len(sales))
+                for sale, number in zip(sales, numbers):
+                    sale.receipt_number = number
+
+            try:
+                with transaction.atomic():
+                    posted = post_sales_batch(entries)
+                    for (sale, _), result in zip(entries, posted):
+                        if result["status"] == "created":
+                            schedule_receipt(sale)
+            except IntegrityError as e:
+                # Another till submitted one of these keys at the same moment
+                logger.warning(f"Sales sync conflict: {e}")
+                return Response(
+                    {"detail": "Conflicting submission, retry the batch."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            for index, result in zip(positions, posted):
+                results[index] = result
+
+        return Response({"results": results}, status=status.HTTP_200_OK)
@@ -99,10 +99,8 @@ TEMPLATES = [
                 "social_django.context_processors.backends",
                 "social_django.context_processors.login_redirect",
                 # Custom context processors
+                "apps.authentication.context_processors.user_role_context",
                 "apps.authentication.context_processors.guest_profiles_context",
-                "apps.authentication.context_processors.guest_user_feedback_context",
-                "apps.authentication.context_processors.low_stock_alerts_context",
-                "apps.authentication.context_processors.pending_orders_context",
             ],
         },
     },
@@ -144,6 +142,9 @@ DATABASES = {
 MEDIA_ROOT = BASE_DIR / "media"
 LOCAL_MEDIA_URL = "/media/"
 
+# Rendered sale receipts (PDF cache on local disk)
+RECEIPTS_DIR = BASE_DIR / "receipts"
+
 # Static files configuration
 STATIC_URL = "/static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
@@ -165,6 +166,19 @@ DEFAULT_FILE_STORAGE = "cloudinary_storage.storage.MediaCloudinaryStorage"
 # Cloudinary media URL online
 MEDIA_URL = f"https://res.cloudinary.com/{CLOUDINARY_CLOUD_NAME}/"
 
+# Image uploads are stored in the background by the backend below; use
+# apps.main.images.LocalImageStorage for tests and installs without Cloudinary
+IMAGE_STORAGE = os.getenv("IMAGE_STORAGE", "apps.main.images.CloudinaryImageStorage")
+# Uploaded originals waiting for the background worker
+IMAGE_PENDING_DIR = MEDIA_ROOT / "pending"
+# Local image storage; URLs must be absolute to pass through CloudinaryField
+IMAGE_LOCAL_DIR = MEDIA_ROOT / "images"
+IMAGE_LOCAL_URL = os.getenv(
+    "IMAGE_LOCAL_URL", f"http://localhost:8000{LOCAL_MEDIA_URL}images/"
+)
+# Thumbnail sizes (bounding square, in pixels) generated for every image
+IMAGE_THUMBNAIL_SIZES = (100, 300, 600)
+
 ############################### REST FRAMEWORK AND JWT CONFIGURATION ###############################
 
 # Django REST framework configuration
@@ -179,6 +193,9 @@ REST_FRAMEWORK = {
 # Simple JWT configuration
 SIMPLE_JWT = {
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Carry the user's role as a "role" claim for API clients
+    "TOKEN_OBTAIN_SERIALIZER": "apps.authentication.serializers.RoleTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.authentication.serializers.RoleTokenRefreshSerializer",
 }
 
 ############################### EMAIL CONFIGURATION ###############################
@@ -287,6 +304,43 @@ LOGGING = {
     },
 }
 
+############################### CACHE CONFIGURATION ###############################
+
+# Shared by every gunicorn worker: Redis when REDIS_URL is set, otherwise the
+# database cache table (create it with "python manage.py createcachetable")
+REDIS_URL = os.getenv("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "django_cache",
+            "OPTIONS": {"MAX_ENTRIES": 5000},
+        }
+    }
+# Dashboard metrics are invalidated on write, so this only bounds stale keys
+METRICS_CACHE_TIMEOUT = int(os.getenv("METRICS_CACHE_TIMEOUT", 60 * 60 * 24))
+
+############################### BACKGROUND TASKS ###############################
+
+# Thread pool for work deferred until after the response (e.g. receipt PDFs)
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", 2))
+# Run background tasks inline (useful for tests and management commands)
+BACKGROUND_TASKS_EAGER = os.getenv("BACKGROUND_TASKS_EAGER", "False") == "True"
+
+############################### RECEIPT NUMBERS ###############################
+
+# Branch prefix of receipt numbers, e.g. "JBL-20240101-000123"
+RECEIPT_BRANCH_CODE = os.getenv("RECEIPT_BRANCH_CODE", "JBL")
+# Receipt numbers each worker reserves from the database at a time
+RECEIPT_BLOCK_SIZE = int(os.getenv("RECEIPT_BLOCK_SIZE", 50))
+
 ############################### DEFAULT PRIMARY KEY FIELD TYPE ###############################
 
 # Default primary key field type
@@ -0,0 +1,100 @@
+// Fill the navbar badges from the notifications endpoint and keep them fresh.
+// The browser revalidates with If-None-Match, so unchanged polls are a 304.
+(function () {
+  const url = document.currentScript.dataset.url;
+  const POLL_INTERVAL = 60000;
+
+  function formatTime(value) {
+    return new Date(value).toLocaleTimeString([], { hour: "numeric", minute: "2-digit" });
+  }
+
+  // Badge text and the line shown under it, per counter
+  const renderers = {
+    orders: (item) => ({
+      badge: ["badge-success", "Request"],
+      text: ["Order from ", item.customer],
+      time: formatTime(item.created_at),
+    }),
+    low_stock: (item) => ({
+      badge: ["badge-warning", "Low Stock"],
+      text: ["", item.name, "Current Stock: " + item.quantity],
+    }),
+    feedback: (item) => ({
+      badge: ["badge-success", "Request"],
+      text: ["Support needed for ", item.name],
+      time: formatTime(item.created_at),
+    }),
+  };
+
+  function renderItem(href, entry) {
+    const link = document.createElement("a");
+    link.className = "dropdown-item preview-item";
+    link.href = href;
+    link.onclick = () => confirm("You will be redirected to a page for taking action");
+
+    const content = document.createElement("div");
+    content.className = "preview-item-content flex-grow";
+    const badge = document.createElement("span");
+    badge.className = "badge badge-pill " + entry.badge[0];
+    badge.textContent = entry.badge[1];
+    const text = document.createElement("p");
+    text.className = "text-small text-muted ellipsis mb-0";
+    const [prefix, name, detail] = entry.text;
+    const bold = document.createElement("b");
+    bold.textContent = name;
+    text.append(prefix, bold);
+    if (detail) {
+      text.append(document.createElement("br"), detail);
+    }
+    content.append(badge, text);
+    link.append(content);
+
+    if (entry.time) {
+      const time = document.createElement("p");
+      time.className = "text-small text-muted align-self-start";
+      time.textContent = entry.time;
+      link.append(time);
+    }
+    return link;
+  }
+
+  function render(data) {
+    Object.entries(renderers).forEach(([name, renderer]) => {
+      const counter = data[name];
+      if (!counter) {
+        return;
+      }
+      document.querySelectorAll(`[data-notification-count="${name}"]`).forEach((element) => {
+        element.textContent = counter.count;
+      });
+      document.querySelectorAll(`[data-notification-list="${name}"]`).forEach((list) => {
+        if (!list.dataset.empty) {
+          list.dataset.empty = list.innerHTML;
+        }
+        if (!counter.items.length) {
+          list.innerHTML = list.dataset.empty;
+          return;
+        }
+        list.replaceChildren(...counter.items.map((item) => renderItem(list.dataset.url, renderer(item))));
+      });
+    });
+  }
+
+  async function refresh() {
+    if (document.hidden) {
+      return;
+    }
+    try {
+      const response = await fetch(url, { cache: "no-cache", credentials: "same-origin" });
+      if (response.ok) {
+        render(await response.json());
+      }
+    } catch (error) {
+      console.error("Error fetching notifications:", error);
+    }
+  }
+
+  refresh();
+  setInterval(refresh, POLL_INTERVAL);
+  document.addEventListener("visibilitychange", refresh);
+})();